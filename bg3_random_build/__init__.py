@@ -1,3 +1,42 @@
-from .config import DEFAULTS
-from .data_io import load_breakpoints, load_themes
-from .logic import suggest_build, suggest_many
+import importlib
+
+# Public names and the submodule defining each. They are imported on first
+# access, so `import bg3_random_build` (and the CLI) only pays for what is used.
+_EXPORTS = {
+    "DEFAULTS": "config",
+    "load_breakpoints": "data_io",
+    "load_themes": "data_io",
+    "suggest_build": "logic",
+    "suggest_many": "logic",
+    "BuildGenerator": "generator",
+    "Build": "models",
+    "BuildConstraints": "constraints",
+    "write_builds": "export",
+    "generate_parallel": "parallel",
+    "iter_builds": "parallel",
+    "Catalog": "catalog",
+    "load_catalog": "catalog",
+    "GenerationStats": "stats",
+    "GeneratorCache": "generator_cache",
+    "LiveCatalog": "live_catalog",
+    "SharedCatalog": "shared_catalog",
+    "analyze_config": "analysis",
+    "enumerate_builds": "distribution",
+    "outcome_probabilities": "distribution",
+    "generate_async": "async_api",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
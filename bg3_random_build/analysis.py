@@ -0,0 +1,286 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .catalog import Catalog
+from .config import CASTER_PARENTS, DEFAULTS, MARTIAL_PARENTS
+from .logic import COMPOSITION_WEIGHT_DEFAULTS, ParentSetTable, composition_parent_sets
+
+
+Pair = Tuple[int, str]
+
+# Inner attempts per (subclass count, composition) draw before drawing again.
+ATTEMPTS_PER_PAIR = 80
+
+# Rogue levels that give access to martial-gated themes without Extra Attack.
+ROGUE_MARTIAL_LEVEL = 4
+
+INFEASIBLE_REASONS = {
+    "composition": "no allowed subclasses form this composition",
+    "level_cap": "every subclass combination exceeds the level cap",
+    "extra_attack": "no subclass combination can reach Extra Attack under the level cap",
+    "constraints": "no subclass combination meets the build constraints",
+}
+
+
+class ConfigAnalysis(NamedTuple):
+    """Which (subclass count, composition) outcomes a configuration can produce.
+
+    ``draw_probabilities`` holds the chance that a (count, composition) draw
+    picks each feasible outcome: its weight renormalized over the feasible
+    outcomes. Outcomes whose attempts often fail, such as many subclasses
+    under a low level cap, are drawn again more often and so make up fewer
+    builds than that. ``probabilities`` holds the share of generated builds
+    with each outcome when it was computed (``analyze_config(exact=True)``),
+    otherwise None. ``infeasible`` maps every outcome that has a positive
+    weight but can never produce a build to a reason key from
+    ``INFEASIBLE_REASONS``.
+    """
+
+    draw_probabilities: Dict[Pair, float]
+    infeasible: Dict[Pair, str]
+    probabilities: Optional[Dict[Pair, float]] = None
+
+    @property
+    def feasible(self) -> bool:
+        return bool(self.draw_probabilities)
+
+    def _odds(self, draws: bool) -> Dict[Pair, float]:
+        if draws:
+            return self.draw_probabilities
+        if self.probabilities is None:
+            raise ValueError("build probabilities were not computed; use analyze_config(exact=True)")
+        return self.probabilities
+
+    def k_probabilities(self, draws: bool = False) -> Dict[int, float]:
+        """Share of builds per subclass count, or with ``draws=True`` of draws."""
+        out: Dict[int, float] = {}
+        for (k, _), probability in self._odds(draws).items():
+            out[k] = out.get(k, 0.0) + probability
+        return out
+
+    def composition_probabilities(self, draws: bool = False) -> Dict[str, float]:
+        """Share of builds per composition, or with ``draws=True`` of draws."""
+        out: Dict[str, float] = {}
+        for (_, comp_target), probability in self._odds(draws).items():
+            out[comp_target] = out.get(comp_target, 0.0) + probability
+        return out
+
+    def messages(self) -> List[str]:
+        return [
+            f"{k} subclass(es), {comp_target}: {INFEASIBLE_REASONS[reason]}"
+            for (k, comp_target), reason in self.infeasible.items()
+        ]
+
+
+def pair_success_weight(weight: float, success: float) -> float:
+    """Weight of a (count, composition) pair among the builds it produces.
+
+    ``success`` is the chance that one attempt for the pair succeeds. A draw
+    makes up to ``ATTEMPTS_PER_PAIR`` attempts and is drawn again if all of
+    them fail, so the pair's share of builds follows this, not ``weight``.
+    """
+    return weight * (1.0 - (1.0 - success) ** ATTEMPTS_PER_PAIR)
+
+
+# The build rules below are shared by the generator, the legacy helpers in
+# logic, the constraint index, the NumPy sampler and the exact distribution.
+
+
+def parent_role(parents: Iterable[str]) -> str:
+    """Composition role of a build with these parent classes: martial, caster or hybrid."""
+    parents = tuple(parents)
+    has_martial = any(parent in MARTIAL_PARENTS for parent in parents)
+    has_caster = any(parent in CASTER_PARENTS for parent in parents)
+    if has_martial and has_caster:
+        return "hybrid"
+    return "caster" if has_caster else "martial"
+
+
+def level_reachable(total, level, target, cap):
+    """Whether filling to ``cap`` can take a subclass from ``level`` to ``target`` (0: never).
+
+    ``total`` is the level sum of the whole build. Filling tops up the
+    subclass closest to Extra Attack first, so a target is reachable exactly
+    when this subclass can sit at it with every other subclass where it is.
+    Works elementwise on NumPy arrays too.
+    """
+    return (target > 0) & ((level >= target) | (total - level + target <= cap))
+
+
+def has_extra_attack(levels: Iterable[int], thresholds: Iterable[int]) -> bool:
+    """Whether some subclass reached its Extra Attack threshold (0: never)."""
+    return any(threshold and level >= threshold for level, threshold in zip(levels, thresholds))
+
+
+def martial_access_level(parent: str, ea_threshold: int) -> int:
+    """Lowest level of a subclass that unlocks martial-gated themes (0: never).
+
+    That is its Extra Attack threshold, or a Rogue level of 4.
+    """
+    levels = [ea_threshold] if ea_threshold else []
+    if parent == "Rogue":
+        levels.append(ROGUE_MARTIAL_LEVEL)
+    return min(levels, default=0)
+
+
+def has_martial_access(levels: Iterable[int], access_levels: Iterable[int]) -> bool:
+    """Whether final levels unlock martial-gated themes, given ``martial_access_level`` per subclass."""
+    return any(0 < access <= level for level, access in zip(levels, access_levels))
+
+
+def _parent_limits(catalog: Catalog) -> Dict[str, Tuple[int, Optional[int]]]:
+    # Per parent: the lowest breakpoint of any of its subclasses, and the lowest
+    # level at which one of its subclasses both fits a breakpoint and has Extra
+    # Attack (max of its lowest breakpoint and its threshold), if any.
+    limits = {}
+    for parent, subclass_ids in zip(catalog.parent_names, catalog.subclasses_by_parent):
+        min_level = min(catalog.level_options(i)[0] for i in subclass_ids)
+        ea_levels = [
+            max(catalog.level_options(i)[0], catalog.ea_thresholds[i])
+            for i in subclass_ids
+            if catalog.ea_thresholds[i]
+        ]
+        limits[parent] = (min_level, min(ea_levels) if ea_levels else None)
+    return limits
+
+
+def parent_signature(catalog: Catalog) -> Tuple[Tuple[str, int, int, Optional[int]], ...]:
+    """Each parent class with its subclass count and level limits, in catalog order.
+
+    This is all ``pair_tables`` reads from a catalog, so two catalogs with the
+    same signature get the same tables for the same settings.
+    """
+    limits = _parent_limits(catalog)
+    return tuple(
+        (parent, len(subclass_ids)) + limits[parent]
+        for parent, subclass_ids in zip(catalog.parent_names, catalog.subclasses_by_parent)
+    )
+
+
+def _parent_set_fits(
+    parents: Tuple[str, ...],
+    limits: Dict[str, Tuple[int, Optional[int]]],
+    level_cap: int,
+    needs_ea: bool,
+) -> Optional[str]:
+    # Return None when some subclass combination of these parents can succeed,
+    # otherwise the reason key. Every subclass starts at its parent's lowest
+    # breakpoint; see level_reachable.
+    min_sum = sum(limits[parent][0] for parent in parents)
+    if min_sum > level_cap:
+        return "level_cap"
+    if needs_ea and not any(
+        level_reachable(min_sum, limits[parent][0], limits[parent][1] or 0, level_cap) for parent in parents
+    ):
+        return "extra_attack"
+    return None
+
+
+def pair_tables(
+    catalog: Catalog,
+    level_cap: int,
+    num_subclass_weights: Dict[int, float],
+    composition_weights: Dict[str, float],
+    require_ea_if_martial: bool,
+    prefer_ea_if_hybrid: float,
+) -> Tuple[Dict[Pair, ParentSetTable], Dict[Pair, float], Dict[Pair, str], Dict[Pair, float]]:
+    """Build the parent-set table of every feasible (count, composition) pair.
+
+    Parent sets whose subclasses can never fit the cap (or never reach a
+    required Extra Attack) are dropped, so sampling only retries inside sets
+    where success is possible. Returns the tables, the pair weights, the
+    reason for every positively weighted pair that turned out infeasible, and
+    the share of each pair's parent-set weight that was kept. A draw from the
+    dropped share is a failed attempt; counting it as one keeps the odds of
+    each pair what they were before the sets were dropped.
+    """
+    groups_by_parent = dict(zip(catalog.parent_names, catalog.subclasses_by_parent))
+    limits = _parent_limits(catalog)
+    tables: Dict[Pair, ParentSetTable] = {}
+    weights: Dict[Pair, float] = {}
+    infeasible: Dict[Pair, str] = {}
+    kept_shares: Dict[Pair, float] = {}
+    for k, k_weight in num_subclass_weights.items():
+        if k_weight <= 0:
+            continue
+        for comp_target, comp_weight in composition_weights.items():
+            if comp_weight <= 0:
+                continue
+            pair = (k, comp_target)
+            parent_sets, cum_weights = composition_parent_sets(k, groups_by_parent, comp_target)
+            if not parent_sets:
+                infeasible[pair] = "composition"
+                continue
+
+            kept: List[Tuple[str, ...]] = []
+            kept_cum: List[int] = []
+            total = 0
+            reasons = set()
+            previous = 0
+            for parents, cum_weight in zip(parent_sets, cum_weights):
+                role = parent_role(parents)
+                needs_ea = (role == "martial" and require_ea_if_martial) or (
+                    role == "hybrid" and prefer_ea_if_hybrid >= 1
+                )
+                reason = _parent_set_fits(parents, limits, level_cap, needs_ea)
+                if reason is None:
+                    total += cum_weight - previous
+                    kept.append(parents)
+                    kept_cum.append(total)
+                else:
+                    reasons.add(reason)
+                previous = cum_weight
+
+            if kept:
+                tables[pair] = (kept, kept_cum)
+                weights[pair] = k_weight * comp_weight
+                kept_shares[pair] = total / previous
+            else:
+                infeasible[pair] = "level_cap" if "level_cap" in reasons and len(reasons) == 1 else "extra_attack"
+    return tables, weights, infeasible, kept_shares
+
+
+def analyze_config(
+    catalog: Catalog,
+    level_cap: int = DEFAULTS.level_cap,
+    num_subclass_weights: Dict[int, float] = None,
+    composition_weights: Dict[str, float] = None,
+    require_ea_if_martial: bool = DEFAULTS.require_ea_if_martial,
+    prefer_ea_if_hybrid: float = DEFAULTS.prefer_ea_if_hybrid,
+    exact: bool = False,
+) -> ConfigAnalysis:
+    """Check a generator configuration without generating anything.
+
+    Use this before generating (e.g. to disable a Generate button) instead of
+    waiting for ``BuildGenerator`` to fail. It only looks at the level limits
+    of each parent class, so it takes milliseconds. ``exact=True`` also fills
+    in ``probabilities`` with ``distribution.outcome_probabilities``, which
+    walks every subclass combination and takes seconds on the vanilla catalog.
+    """
+    if num_subclass_weights is None:
+        num_subclass_weights = DEFAULTS.num_subclasses_weights
+    if composition_weights is None:
+        composition_weights = COMPOSITION_WEIGHT_DEFAULTS
+
+    _, weights, infeasible, _ = pair_tables(
+        catalog,
+        level_cap,
+        num_subclass_weights,
+        composition_weights,
+        require_ea_if_martial,
+        prefer_ea_if_hybrid,
+    )
+    total = sum(weights.values())
+    draw_probabilities = {pair: weight / total for pair, weight in weights.items()}
+    probabilities = None
+    if exact:
+        from .distribution import outcome_probabilities
+
+        probabilities = outcome_probabilities(
+            catalog,
+            level_cap,
+            num_subclass_weights,
+            composition_weights,
+            require_ea_if_martial,
+            prefer_ea_if_hybrid,
+        )
+    return ConfigAnalysis(draw_probabilities, infeasible, probabilities)
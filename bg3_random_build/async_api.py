@@ -0,0 +1,100 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .generator import BuildGenerator, GenerationStopped
+from .stats import GenerationStats
+
+
+# Why a generation call ended.
+COMPLETE = "complete"  # all requested builds were generated
+DEADLINE = "deadline"  # the time budget ran out
+CANCELLED = "cancelled"  # the caller cancelled
+INFEASIBLE = "infeasible"  # the settings can never produce a build
+EXHAUSTED = "exhausted"  # a build used up max_global_attempts without success
+
+
+@dataclass
+class GenerationResult:
+    """The builds finished before generation ended, and why it ended."""
+
+    builds: List[Tuple[str, str]]
+    reason: str
+    message: str = ""
+
+    @property
+    def complete(self) -> bool:
+        return self.reason == COMPLETE
+
+
+def generate_within(
+    generator: BuildGenerator,
+    n: int,
+    deadline: Optional[float] = None,
+    cancel: Optional[threading.Event] = None,
+    rng: Optional[random.Random] = None,
+    stats: Optional[GenerationStats] = None,
+) -> GenerationResult:
+    """Generate up to ``n`` builds, stopping at ``deadline`` or when ``cancel`` is set.
+
+    ``deadline`` is a ``time.monotonic()`` value. Both are checked between
+    builds and before every count/composition draw inside a build, so even a
+    configuration that rarely succeeds stops within a few milliseconds.
+    Never raises for failed generation; the result carries a reason code.
+    """
+    builds: List[Tuple[str, str]] = []
+
+    def stop() -> bool:
+        return (cancel is not None and cancel.is_set()) or (
+            deadline is not None and time.monotonic() >= deadline
+        )
+
+    def stopped() -> GenerationResult:
+        reason = CANCELLED if cancel is not None and cancel.is_set() else DEADLINE
+        return GenerationResult(builds, reason)
+
+    try:
+        generator.check_feasible()
+    except RuntimeError as e:
+        return GenerationResult(builds, INFEASIBLE, str(e))
+
+    try:
+        while len(builds) < n:
+            if stop():
+                return stopped()
+            builds.append(generator.generate_one(rng, stats, stop))
+    except GenerationStopped:
+        return stopped()
+    except RuntimeError as e:
+        return GenerationResult(builds, EXHAUSTED, str(e))
+    return GenerationResult(builds, COMPLETE)
+
+
+async def generate_async(
+    generator: BuildGenerator,
+    n: int,
+    timeout: Optional[float] = None,
+    rng: Optional[random.Random] = None,
+    stats: Optional[GenerationStats] = None,
+    executor: Optional[Executor] = None,
+) -> GenerationResult:
+    """Generate up to ``n`` builds in ``executor`` without blocking the event loop.
+
+    Generation ends after ``timeout`` seconds with the builds finished so far
+    and reason ``DEADLINE``. Cancelling the awaiting task stops the worker
+    thread at its next check and re-raises ``CancelledError`` as usual. Pass a
+    ``random.Random`` per call when several calls share a generator.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    cancel = threading.Event()
+    future = loop.run_in_executor(executor, generate_within, generator, n, deadline, cancel, rng, stats)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        cancel.set()
+        raise
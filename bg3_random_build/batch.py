@@ -0,0 +1,194 @@
+import random
+from typing import Iterator, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed for the batch sampler
+    np = None
+
+from .analysis import ATTEMPTS_PER_PAIR, level_reachable, parent_role
+from .catalog import Catalog
+from .generator import BuildGenerator
+from .models import Build
+
+
+DEFAULT_BATCH_SIZE = 10000
+
+_MARTIAL, _CASTER, _HYBRID = 0, 1, 2
+_ROLE_CODES = {"martial": _MARTIAL, "caster": _CASTER, "hybrid": _HYBRID}
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+class BatchSampler:
+    """Draw many builds at once with NumPy, with the distribution of ``BuildGenerator``.
+
+    Count/composition pairs, parent sets, subclasses and breakpoint levels are
+    drawn for a whole batch as integer arrays, and the level cap and Extra
+    Attack checks are array operations. Only accepted rows go through the
+    scalar fill and the name/blurb formatting.
+
+    Every row repeats the scalar attempt loop: up to ``ATTEMPTS_PER_PAIR``
+    attempts per count/composition draw, and at most ``max_global_attempts``
+    draws. So each build has the same distribution as a ``generate_one`` call.
+    The random streams differ, though, so a seed does not give the same builds
+    as the scalar path.
+    """
+
+    def __init__(self, generator: BuildGenerator):
+        if np is None:
+            raise RuntimeError("The batch sampler needs NumPy (pip install numpy).")
+        if generator.constraints is not None or generator.theme_first:
+            # Its checks cover levels and Extra Attack only, not themes or constraints.
+            raise ValueError("The batch sampler does not support build constraints or theme-first generation.")
+        self.generator = generator
+        catalog = generator.catalog
+
+        options = [catalog.level_options(i) for i in range(len(catalog))]
+        width = max((len(levels) for levels in options), default=1)
+        self._levels = np.zeros((len(options), width), dtype=np.int64)
+        for i, levels in enumerate(options):
+            self._levels[i, : len(levels)] = levels
+        self._level_counts = np.array([len(levels) for levels in options], dtype=np.int64)
+        # Level options are sorted, so column 0 holds the lowest breakpoint.
+        self._min_levels = self._levels[:, 0].copy()
+        self._ea_thresholds = np.array(catalog.ea_thresholds, dtype=np.int64)
+
+        members: List[int] = []
+        starts: List[int] = []
+        for subclass_ids in catalog.subclasses_by_parent:
+            starts.append(len(members))
+            members.extend(subclass_ids)
+        self._group_members = np.array(members, dtype=np.int64)
+        self._group_start = np.array(starts, dtype=np.int64)
+        self._group_size = np.array([len(ids) for ids in catalog.subclasses_by_parent], dtype=np.int64)
+
+        # Per pair: parent ids of each parent set, cumulative weights, set
+        # roles and the share of the parent-set weight left after dropping the
+        # sets that never fit (None when nothing was dropped).
+        self._pair_tables = []
+        for pair in generator._pairs:
+            group_sets, cum_weights = generator._composition_tables[pair]
+            parent_sets = [[catalog.subclass_parent[group[0]] for group in groups] for groups in group_sets]
+            roles = [_ROLE_CODES[parent_role([catalog.parent_names[p] for p in parents])] for parents in parent_sets]
+            self._pair_tables.append(
+                (
+                    np.array(parent_sets, dtype=np.int64),
+                    np.array(cum_weights, dtype=np.float64),
+                    np.array(roles, dtype=np.int64),
+                    generator._kept_shares.get(pair),
+                )
+            )
+        self._pair_cum_weights = np.array(generator._pair_cum_weights, dtype=np.float64)
+
+    def _draw_pairs(self, size: int, rng) -> "np.ndarray":
+        total = self._pair_cum_weights[-1]
+        return np.searchsorted(self._pair_cum_weights, rng.random(size) * total, side="right")
+
+    def _attempt(self, pair_index: int, size: int, rng):
+        # One attempt for ``size`` rows of the same pair. Returns subclass ids,
+        # breakpoint levels, the Extra Attack wish and the accepted mask.
+        generator = self.generator
+        cap = generator.level_cap
+        parent_sets, cum_weights, roles, kept_share = self._pair_tables[pair_index]
+        picked = np.searchsorted(cum_weights, rng.random(size) * cum_weights[-1], side="right")
+        parents = parent_sets[picked]
+        offsets = (rng.random(parents.shape) * self._group_size[parents]).astype(np.int64)
+        chosen = self._group_members[self._group_start[parents] + offsets]
+
+        # A uniform draw among the assignments under the cap, by rejection.
+        # Rows whose lowest breakpoints already exceed the cap have no such
+        # assignment and fail the attempt, as in the scalar breakpoint solver.
+        levels = np.zeros(chosen.shape, dtype=np.int64)
+        accepted = self._min_levels[chosen].sum(axis=1) <= cap
+        if kept_share is not None:
+            # Rows that drew one of the dropped parent sets fail the attempt.
+            accepted &= rng.random(size) < kept_share
+        todo = np.nonzero(accepted)[0]
+        while todo.size:
+            subclasses = chosen[todo]
+            columns = (rng.random(subclasses.shape) * self._level_counts[subclasses]).astype(np.int64)
+            drawn = self._levels[subclasses, columns]
+            fits = drawn.sum(axis=1) <= cap
+            levels[todo[fits]] = drawn[fits]
+            todo = todo[~fits]
+
+        role = roles[picked]
+        want_ea = (role == _MARTIAL) & generator.require_ea_if_martial
+        want_ea |= (role == _HYBRID) & (rng.random(size) < generator.prefer_ea_if_hybrid)
+
+        thresholds = self._ea_thresholds[chosen]
+        totals = levels.sum(axis=1, keepdims=True)
+        reachable = level_reachable(totals, levels, thresholds, cap)
+        accepted &= ~want_ea | reachable.any(axis=1)
+        return chosen, levels, want_ea, accepted
+
+    def sample(self, size: int, rng) -> List[Tuple[List[int], List[int], bool]]:
+        """Return ``(subclass ids, breakpoint levels, want Extra Attack)`` per row."""
+        self.generator.check_feasible()
+        pair_of = self._draw_pairs(size, rng)
+        tries = np.zeros(size, dtype=np.int64)
+        draws = np.ones(size, dtype=np.int64)
+        rows: List[Optional[Tuple[List[int], List[int], bool]]] = [None] * size
+        active = np.arange(size)
+        while active.size:
+            accepted_mask = np.zeros(active.size, dtype=bool)
+            active_pairs = pair_of[active]
+            for pair_index in np.unique(active_pairs):
+                positions = np.nonzero(active_pairs == pair_index)[0]
+                chosen, levels, want_ea, accepted = self._attempt(int(pair_index), positions.size, rng)
+                for j in np.nonzero(accepted)[0]:
+                    rows[active[positions[j]]] = (chosen[j].tolist(), levels[j].tolist(), bool(want_ea[j]))
+                accepted_mask[positions] = accepted
+
+            active = active[~accepted_mask]
+            tries[active] += 1
+            exhausted = active[tries[active] >= ATTEMPTS_PER_PAIR]
+            if exhausted.size:
+                draws[exhausted] += 1
+                if draws.max() > self.generator.max_global_attempts:
+                    raise RuntimeError("No valid combination found.")
+                pair_of[exhausted] = self._draw_pairs(exhausted.size, rng)
+                tries[exhausted] = 0
+        return rows
+
+    def generate(self, size: int, rng, py_rng: random.Random) -> List[Build]:
+        """Generate ``size`` builds; ``py_rng`` drives the scalar fill and naming."""
+        generator = self.generator
+        builds = []
+        for chosen, levels, want_ea in self.sample(size, rng):
+            # The scalar path shuffles the pick order; fill ties and naming use it.
+            order = list(range(len(chosen)))
+            py_rng.shuffle(order)
+            chosen = [chosen[i] for i in order]
+            levels = [levels[i] for i in order]
+            finals = generator.fill_to_cap(chosen, levels, want_ea, py_rng)
+            builds.append(generator.build(chosen, finals, py_rng))
+        return builds
+
+
+def iter_batch_builds(
+    catalog: Catalog,
+    n: Optional[int] = None,
+    seed: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    records: bool = False,
+    **kwargs,
+) -> Iterator[Union[Tuple[str, str], Build]]:
+    """Yield ``(name, line)`` builds drawn ``batch_size`` at a time with ``BatchSampler``.
+
+    Generation stops after ``n`` builds, or never when ``n`` is None. With
+    ``records=True`` ``Build`` records are yielded instead. Remaining keyword
+    arguments are passed to ``BuildGenerator``.
+    """
+    sampler = BatchSampler(BuildGenerator(catalog, **kwargs))
+    rng = np.random.default_rng(seed)
+    py_rng = random.Random(int(rng.integers(1 << 62)))
+    produced = 0
+    while n is None or produced < n:
+        size = batch_size if n is None else min(batch_size, n - produced)
+        for build in sampler.generate(size, rng, py_rng):
+            yield build if records else (build.name, build.line)
+        produced += size
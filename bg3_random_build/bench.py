@@ -0,0 +1,243 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from .catalog import Catalog, load_catalog
+from .config import DEFAULTS
+from .generator import BuildGenerator
+from .stats import GenerationStats
+
+
+BENCH_SCHEMA_VERSION = 1
+
+# How many times as long as a bare interpreter start ``import
+# bg3_random_build.cli`` may take; tests/test_import_time.py holds the package
+# to it. A ratio rather than milliseconds, so slow machines don't fail it.
+IMPORT_BUDGET_RATIO = 4.0
+
+# name -> (generator settings, allowed subclasses or None for all)
+SCENARIOS: Dict[str, tuple] = {
+    "default": ({}, None),
+    "cap-6": ({"level_cap": 6}, None),
+    "cap-9": ({"level_cap": 9}, None),
+    "martial-only": ({"composition_weights": {"martial": 1.0, "caster": 0.0, "hybrid": 0.0}}, None),
+    "caster-only": ({"composition_weights": {"martial": 0.0, "caster": 1.0, "hybrid": 0.0}}, None),
+    "hybrid-only": ({"composition_weights": {"martial": 0.0, "caster": 0.0, "hybrid": 1.0}}, None),
+    "four-subclasses": ({"num_subclass_weights": {4: 1.0}}, None),
+    "four-subclasses-cap-9": ({"num_subclass_weights": {4: 1.0}, "level_cap": 9}, None),
+    "single-subclass": ({"num_subclass_weights": {1: 1.0}}, None),
+    # Only high breakpoints on the martial side.
+    "high-breakpoints": (
+        {"level_cap": 12},
+        ["Berserker", "Wildheart", "Giant", "Life", "Light", "Death", "Moon", "Land"],
+    ),
+    # The narrow Streamlit picker case: one martial subclass, hybrid only.
+    "one-martial-hybrid": (
+        {"composition_weights": {"martial": 0.0, "caster": 0.0, "hybrid": 1.0}},
+        ["Wildheart", "Life", "Light", "Death", "Lore", "Glamour", "Moon", "Land"],
+    ),
+}
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run_scenario(
+    catalog: Catalog,
+    settings: dict,
+    subclasses: Optional[List[str]] = None,
+    n: int = 2000,
+    seed: int = 0,
+) -> dict:
+    """Generate ``n`` builds for one scenario and return throughput, latency and stage timings."""
+    if subclasses is not None:
+        catalog = catalog.subset(subclasses)
+    generator = BuildGenerator(catalog, **settings)
+    stats = GenerationStats()
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    started = time.perf_counter()
+    try:
+        for _ in range(n):
+            start = time.perf_counter()
+            generator.generate_one(rng, stats)
+            latencies.append(time.perf_counter() - start)
+    except RuntimeError as e:
+        return {"error": str(e), "builds": len(latencies)}
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "builds": n,
+        "seconds": elapsed,
+        "builds_per_sec": n / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "attempts_per_build": stats.attempts / n,
+        "rejections": dict(stats.rejections),
+        "stages": {
+            stage: {
+                "calls": stats.stage_calls[stage],
+                "seconds": stats.stage_seconds[stage],
+                "calls_per_build": stats.stage_calls[stage] / n,
+            }
+            for stage in stats.stage_seconds
+        },
+    }
+
+
+def run_all(
+    catalog: Catalog,
+    n: int = 2000,
+    seed: int = 0,
+    only: Optional[List[str]] = None,
+) -> dict:
+    scenarios = {}
+    for name, (settings, subclasses) in SCENARIOS.items():
+        if only and name not in only:
+            continue
+        scenarios[name] = run_scenario(catalog, settings, subclasses, n=n, seed=seed)
+    return {
+        "schema": BENCH_SCHEMA_VERSION,
+        "python": platform.python_version(),
+        "builds_per_scenario": n,
+        "seed": seed,
+        "scenarios": scenarios,
+    }
+
+
+def measure_import_ms(module: str = "bg3_random_build.cli") -> float:
+    """Cumulative import time of ``module`` in a fresh interpreter, in ms."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like "import time:  self [us] | cumulative | name"; the
+    # requested module is the last one to finish importing.
+    for line in reversed(proc.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000.0
+    raise RuntimeError(f"no import time reported for {module}")
+
+
+def _wall_ms(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], capture_output=True, check=True)
+    return (time.perf_counter() - start) * 1000.0
+
+
+def measure_import_ratio(module: str = "bg3_random_build.cli", runs: int = 5) -> float:
+    """Wall time of a fresh interpreter importing ``module`` over one running ``pass``.
+
+    The two are started alternately and each side keeps its best of ``runs``,
+    so a busy machine slows both rather than one.
+    """
+    bare, loaded = [], []
+    for _ in range(runs):
+        bare.append(_wall_ms("pass"))
+        loaded.append(_wall_ms(f"import {module}"))
+    return min(loaded) / min(bare)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Return one message per scenario that is slower than the baseline allows."""
+    regressions = []
+    for name, base in baseline.get("scenarios", {}).items():
+        current = results["scenarios"].get(name)
+        if current is None or "error" in base:
+            continue
+        if "error" in current:
+            regressions.append(f"{name}: now fails ({current['error']})")
+            continue
+        floor = base["builds_per_sec"] * (1 - tolerance)
+        if current["builds_per_sec"] < floor:
+            regressions.append(
+                f"{name}: {current['builds_per_sec']:.0f} builds/s, "
+                f"baseline {base['builds_per_sec']:.0f} builds/s"
+            )
+    return regressions
+
+
+def _print_report(results: dict, out) -> None:
+    for name, result in results["scenarios"].items():
+        if "error" in result:
+            print(f"{name:24} error: {result['error']}", file=out)
+            continue
+        stages = ", ".join(
+            f"{stage} {timing['seconds'] * 1000:.0f}ms/{timing['calls_per_build']:.2f}x"
+            for stage, timing in result["stages"].items()
+        )
+        print(
+            f"{name:24} {result['builds_per_sec']:9.0f} builds/s  "
+            f"p50 {result['p50_ms']:.3f}ms  p99 {result['p99_ms']:.3f}ms  [{stages}]",
+            file=out,
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="bg3-builds-bench",
+        description="Benchmark build generation over a matrix of settings.",
+    )
+    p.add_argument("-n", "--num", type=int, default=2000, help="Builds per scenario.")
+    p.add_argument("--breakpoints", default=DEFAULTS.breakpoints_path, help="Path to breakpoints CSV.")
+    p.add_argument("--themes", default=DEFAULTS.themes_path, help="Path to themes CSV.")
+    p.add_argument("--seed", type=int, default=0, help="Random seed for the generated workload.")
+    p.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Only run this scenario (repeatable).")
+    p.add_argument("--output", help="Write JSON results to this path.")
+    p.add_argument("--baseline", help="JSON results from an earlier run to compare against.")
+    p.add_argument("--tolerance", type=float, default=0.2, help="Allowed builds/s drop versus the baseline (0-1).")
+    p.add_argument(
+        "--import-budget-ms",
+        type=float,
+        help="Fail if importing the CLI takes longer than this many milliseconds.",
+    )
+    return p
+
+
+def main(argv=None) -> int:
+    argv = argv if argv is not None else sys.argv[1:]
+    args = build_parser().parse_args(argv)
+
+    try:
+        catalog = load_catalog(args.breakpoints, args.themes)
+    except Exception as e:
+        print(f"Error loading data: {e}", file=sys.stderr)
+        return 2
+
+    results = run_all(catalog, n=args.num, seed=args.seed, only=args.scenario)
+    _print_report(results, sys.stdout)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    if args.import_budget_ms is not None:
+        import_ms = measure_import_ms()
+        print(f"import bg3_random_build.cli: {import_ms:.1f}ms (budget {args.import_budget_ms:.1f}ms)")
+        if import_ms > args.import_budget_ms:
+            print("REGRESSION CLI import time over budget", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
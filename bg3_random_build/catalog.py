@@ -0,0 +1,531 @@
+import hashlib
+import os
+import pickle
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .data_io import BreakpointRow, ThemeRequirements, load_themes, read_breakpoint_rows
+from .logic import ea_threshold
+from .models import SubBreakpoint, subclass_label
+from .theme_index import ThemeIndex
+
+
+# Bump whenever the pickled layout of Catalog or ThemeIndex changes. It is part
+# of the cache key, so caches written by older versions are ignored.
+CATALOG_SCHEMA_VERSION = 3
+CATALOG_CACHE_SUFFIX = ".catalog.pickle"
+
+# Flat buffer layout (see ``Catalog.to_buffer``): magic, schema version, byte
+# order, capability mask width in 64-bit words, then the subclass, level,
+# parent, capability, theme and requirement alternative counts, followed by
+# the sections, each starting at a multiple of 8.
+_BUFFER_MAGIC = b"BG3CATLG"
+_BUFFER_HEADER = struct.Struct("<8sHcBIIIIII")
+_MASK_WORD_BITS = 64
+
+# A compiled breakpoint row: subclass, levels, parent class, capability bitmask.
+_Entry = Tuple[str, Iterable[int], str, int]
+
+
+class _StringTable(Sequence):
+    """Strings read from a buffer: UTF-8 bytes plus the offset where each one ends.
+
+    Each string is decoded the first time it is read. Pickles as a tuple.
+    """
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+        self._decoded: List[Optional[str]] = [None] * (len(offsets) - 1)
+
+    @staticmethod
+    def pack(strings: Iterable[str]) -> Tuple[bytes, bytes]:
+        """Return the offsets and data sections for ``strings``."""
+        offsets = array("I", [0])
+        data = bytearray()
+        for string in strings:
+            data += string.encode("utf-8")
+            offsets.append(len(data))
+        return offsets.tobytes(), bytes(data)
+
+    def __len__(self) -> int:
+        return len(self._decoded)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        string = self._decoded[index]
+        if string is None:
+            if index < 0:
+                index += len(self)
+            string = str(self._data[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+            self._decoded[index] = string
+        return string
+
+    def __eq__(self, other):
+        if not isinstance(other, (tuple, list, _StringTable)):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return tuple, (tuple(self),)
+
+
+class _StringMap(Mapping):
+    """A read-only mapping over two ``_StringTable``s of keys and values.
+
+    The key positions are indexed on the first lookup. Pickles as a dict.
+    """
+
+    def __init__(self, keys: _StringTable, values: _StringTable):
+        self._keys = keys
+        self._values = values
+        self._positions: Optional[Dict[str, int]] = None
+
+    def __getitem__(self, key: str) -> str:
+        if self._positions is None:
+            self._positions = {k: i for i, k in enumerate(self._keys)}
+        return self._values[self._positions[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __reduce__(self):
+        return dict, (list(self.items()),)
+
+
+class _WideMasks(Sequence):
+    """Capability masks wider than one 64-bit word, read from a buffer.
+
+    Each mask is ``words`` native words, least significant first. Pickles as a
+    tuple.
+    """
+
+    def __init__(self, view: memoryview, words: int):
+        self._view = view
+        self._words = words
+
+    def __len__(self) -> int:
+        return len(self._view) // self._words
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("mask index out of range")
+        start = index * self._words
+        mask = 0
+        for shift, word in enumerate(self._view[start:start + self._words]):
+            mask |= word << (shift * _MASK_WORD_BITS)
+        return mask
+
+    def __reduce__(self):
+        return tuple, (tuple(self),)
+
+
+class _Requirements(Sequence):
+    """``ThemeIndex.requirements`` for a buffer: adjectives paired with their alternatives.
+
+    Pickles as a list.
+    """
+
+    def __init__(self, adjectives: _StringTable, alternatives: List[tuple]):
+        self._adjectives = adjectives
+        self._alternatives = alternatives
+
+    def __len__(self) -> int:
+        return len(self._alternatives)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self._adjectives[index], self._alternatives[index]
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def _mask_words(mask: int, words: int) -> List[int]:
+    return [(mask >> (shift * _MASK_WORD_BITS)) & ((1 << _MASK_WORD_BITS) - 1) for shift in range(words)]
+
+
+class Catalog:
+    """Breakpoints and themes compiled to small integers, arrays and bitmasks.
+
+    Subclasses and parent classes are identified by their position in
+    ``subclass_names`` and ``parent_names``. The sorted breakpoint levels of
+    subclass ``i`` are ``levels[level_start[i]:level_start[i + 1]]``, its
+    capabilities are the bitmask ``capability_masks[i]`` (bits assigned by
+    ``theme_index``), and ``ea_thresholds[i]`` is its Extra Attack level, or 0
+    when it never gets Extra Attack.
+
+    ``to_buffer`` lays a catalog out in one flat buffer and ``from_buffer``
+    reads it back without copying it; see ``shared_catalog``.
+    """
+
+    __slots__ = (
+        "subclass_names",
+        "_subclass_ids",
+        "parent_names",
+        "_parent_ids",
+        "subclass_parent",
+        "level_start",
+        "levels",
+        "capability_masks",
+        "ea_thresholds",
+        "subclasses_by_parent",
+        "themes",
+        "theme_index",
+    )
+
+    def __init__(
+        self,
+        rows: Iterable[BreakpointRow],
+        themes: Dict[str, str],
+        theme_requirements: ThemeRequirements,
+    ):
+        self.themes = themes
+        self.theme_index = ThemeIndex(themes, theme_requirements)
+        self._compile(
+            (subclass, levels, parent_class, self.theme_index.mask_for(capabilities))
+            for subclass, levels, parent_class, capabilities in rows
+        )
+
+    def _compile(self, entries: Iterable[_Entry]) -> None:
+        self._subclass_ids: Optional[Dict[str, int]] = {}
+        self._parent_ids: Optional[Dict[str, int]] = {}
+        subclass_names: List[str] = []
+        parent_names: List[str] = []
+        by_parent: List[List[int]] = []
+        capability_masks: List[int] = []
+        self.subclass_parent = array("H")
+        self.level_start = array("H", [0])
+        self.levels = array("b")
+        self.ea_thresholds = array("b")
+
+        for subclass, levels, parent_class, capability_mask in entries:
+            parent_id = self._parent_ids.get(parent_class)
+            if parent_id is None:
+                parent_id = self._parent_ids[parent_class] = len(parent_names)
+                parent_names.append(parent_class)
+                by_parent.append([])
+            subclass_id = self._subclass_ids[subclass] = len(subclass_names)
+            subclass_names.append(subclass)
+            by_parent[parent_id].append(subclass_id)
+
+            self.subclass_parent.append(parent_id)
+            self.levels.extend(sorted(levels))
+            self.level_start.append(len(self.levels))
+            capability_masks.append(capability_mask)
+            self.ea_thresholds.append(ea_threshold(parent_class, subclass) or 0)
+
+        self.subclass_names: Tuple[str, ...] = tuple(subclass_names)
+        self.parent_names: Tuple[str, ...] = tuple(parent_names)
+        self.capability_masks: Tuple[int, ...] = tuple(capability_masks)
+        self.subclasses_by_parent: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(subclass_ids) for subclass_ids in by_parent
+        )
+
+    @property
+    def subclass_ids(self) -> Dict[str, int]:
+        """Subclass name -> id. Do not modify."""
+        if self._subclass_ids is None:
+            self._subclass_ids = {name: i for i, name in enumerate(self.subclass_names)}
+        return self._subclass_ids
+
+    @property
+    def parent_ids(self) -> Dict[str, int]:
+        """Parent class name -> id. Do not modify."""
+        if self._parent_ids is None:
+            self._parent_ids = {name: i for i, name in enumerate(self.parent_names)}
+        return self._parent_ids
+
+    @classmethod
+    def from_breakpoints(
+        cls,
+        sub_bps: List[SubBreakpoint],
+        themes: Dict[str, str],
+        theme_requirements: ThemeRequirements,
+    ) -> "Catalog":
+        """Compile a catalog from ``load_breakpoints`` output, e.g. after filtering it."""
+        rows: Dict[str, BreakpointRow] = {}
+        for bp in sub_bps:
+            row = rows.get(bp.subclass)
+            if row is None:
+                row = rows[bp.subclass] = (bp.subclass, [], bp.parent_class, bp.capabilities)
+            row[1].append(bp.levels)
+        return cls(rows.values(), themes, theme_requirements)
+
+    def subset(self, subclass_names: Iterable[str]) -> "Catalog":
+        """Return a catalog with only the given subclasses, sharing this theme index."""
+        keep = set(subclass_names)
+        out = Catalog.__new__(Catalog)
+        out.themes = self.themes
+        out.theme_index = self.theme_index
+        out._compile(
+            (name, self.level_options(i), self.parent_of(i), self.capability_masks[i])
+            for i, name in enumerate(self.subclass_names)
+            if name in keep
+        )
+        return out
+
+    def with_rows(self, rows: Iterable[BreakpointRow]) -> "Catalog":
+        """Compile new breakpoint rows against this catalog's themes.
+
+        The theme index and its cached theme lookups carry over; it is only
+        copied (see ``ThemeIndex.extended``) when the rows bring a capability
+        it has no bit for. This catalog is left unchanged.
+        """
+        rows = list(rows)
+        theme_index = self.theme_index
+        if any(not capabilities.issubset(theme_index.bits) for _, _, _, capabilities in rows):
+            theme_index = theme_index.extended()
+        out = Catalog.__new__(Catalog)
+        out.themes = self.themes
+        out.theme_index = theme_index
+        out._compile(
+            (subclass, levels, parent_class, theme_index.mask_for(capabilities))
+            for subclass, levels, parent_class, capabilities in rows
+        )
+        return out
+
+    def same_subclasses(self, other: "Catalog") -> bool:
+        """Whether both catalogs have the same subclass ids, levels, parents and capability bits."""
+        # tuple(): either side may have been read from a buffer.
+        return (
+            tuple(self.subclass_names) == tuple(other.subclass_names)
+            and tuple(self.parent_names) == tuple(other.parent_names)
+            and self.subclass_parent == other.subclass_parent
+            and self.level_start == other.level_start
+            and self.levels == other.levels
+            and tuple(self.capability_masks) == tuple(other.capability_masks)
+            and self.ea_thresholds == other.ea_thresholds
+            and self.theme_index.bits == other.theme_index.bits
+        )
+
+    def to_buffer(self) -> bytes:
+        """Lay the catalog out in one flat buffer for ``from_buffer``.
+
+        Numbers are stored in native byte order, so a buffer is meant for
+        processes on the same machine.
+        """
+        n = len(self.subclass_names)
+        capabilities = list(self.theme_index.bits)
+        words = max(1, -(-len(capabilities) // _MASK_WORD_BITS))
+        alternative_start = array("H", [0])
+        alternative_masks = array("Q")
+        alternative_martial = array("b")
+        for _, alternatives in self.theme_index.requirements:
+            for required, needs_martial in alternatives:
+                alternative_masks.extend(_mask_words(required, words))
+                alternative_martial.append(needs_martial)
+            alternative_start.append(len(alternative_martial))
+        masks = array("Q")
+        for mask in self.capability_masks:
+            masks.extend(_mask_words(mask, words))
+
+        sections = [
+            self.subclass_parent.tobytes(),
+            self.level_start.tobytes(),
+            self.levels.tobytes(),
+            self.ea_thresholds.tobytes(),
+            masks.tobytes(),
+            alternative_start.tobytes(),
+            alternative_masks.tobytes(),
+            alternative_martial.tobytes(),
+        ]
+        for strings in (self.subclass_names, self.parent_names, capabilities, self.themes, self.themes.values()):
+            sections.extend(_StringTable.pack(strings))
+        header = _BUFFER_HEADER.pack(
+            _BUFFER_MAGIC,
+            CATALOG_SCHEMA_VERSION,
+            sys.byteorder[0].encode(),
+            words,
+            n,
+            len(self.levels),
+            len(self.parent_names),
+            len(capabilities),
+            len(self.themes),
+            len(alternative_martial),
+        )
+        out = bytearray(header)
+        for section in sections:
+            out += bytes(-len(out) % 8)
+            out += section
+        return bytes(out)
+
+    @classmethod
+    def from_buffer(cls, buffer) -> "Catalog":
+        """Read a catalog from a ``to_buffer`` buffer (e.g. an ``mmap``) without copying it.
+
+        The level, parent, Extra Attack and capability arrays are memoryviews
+        into ``buffer``, and names and blurbs are decoded from it as they are
+        first read, so ``buffer`` must stay unchanged while the catalog is in
+        use. Only the requirement alternatives and the per-parent subclass
+        lists are built up front. Raises ValueError for anything but a buffer
+        of this schema version and byte order.
+        """
+        view = memoryview(buffer).cast("B")
+        try:
+            (
+                magic,
+                version,
+                byte_order,
+                words,
+                n,
+                n_levels,
+                n_parents,
+                n_capabilities,
+                n_themes,
+                n_alternatives,
+            ) = _BUFFER_HEADER.unpack_from(view)
+        except struct.error:
+            magic = None
+        if magic != _BUFFER_MAGIC or version != CATALOG_SCHEMA_VERSION or byte_order != sys.byteorder[0].encode():
+            raise ValueError("Not a compiled catalog buffer of this version")
+        offset = _BUFFER_HEADER.size
+
+        def section(size: int) -> memoryview:
+            nonlocal offset
+            offset += -offset % 8
+            part = view[offset:offset + size]
+            offset += size
+            return part
+
+        def strings(count: int) -> _StringTable:
+            offsets = section(4 * (count + 1)).cast("I")
+            return _StringTable(offsets, section(offsets[-1]))
+
+        out = cls.__new__(cls)
+        out.subclass_parent = section(2 * n).cast("H")
+        out.level_start = section(2 * (n + 1)).cast("H")
+        out.levels = section(n_levels).cast("b")
+        out.ea_thresholds = section(n).cast("b")
+        masks = section(8 * words * n).cast("Q")
+        # One word covers up to 64 capabilities, which is the usual case.
+        out.capability_masks = masks if words == 1 else _WideMasks(masks, words)
+        alternative_start = section(2 * (n_themes + 1)).cast("H")
+        alternative_masks = _WideMasks(section(8 * words * n_alternatives).cast("Q"), words)
+        alternative_martial = section(n_alternatives).cast("b")
+        out.subclass_names = strings(n)
+        out.parent_names = strings(n_parents)
+        capabilities = strings(n_capabilities)
+        adjectives = strings(n_themes)
+        out.themes = _StringMap(adjectives, strings(n_themes))
+
+        out._subclass_ids = None
+        out._parent_ids = None
+        by_parent: List[List[int]] = [[] for _ in range(n_parents)]
+        for subclass_id, parent_id in enumerate(out.subclass_parent):
+            by_parent[parent_id].append(subclass_id)
+        out.subclasses_by_parent = tuple(tuple(subclass_ids) for subclass_ids in by_parent)
+        alternatives = [
+            tuple(
+                (alternative_masks[i], bool(alternative_martial[i]))
+                for i in range(alternative_start[theme], alternative_start[theme + 1])
+            )
+            for theme in range(n_themes)
+        ]
+        out.theme_index = ThemeIndex.from_compiled(out.themes, capabilities, _Requirements(adjectives, alternatives))
+        return out
+
+    def __getstate__(self):
+        # Arrays read from a buffer are memoryviews, which cannot be pickled;
+        # the other buffer-backed fields pickle as tuples, lists and dicts.
+        state = {name: getattr(self, name) for name in self.__slots__}
+        for name, value in state.items():
+            if isinstance(value, memoryview):
+                state[name] = array(value.format, value.tobytes())
+        return None, state
+
+    def __len__(self) -> int:
+        return len(self.subclass_names)
+
+    def level_options(self, subclass_id: int) -> Tuple[int, ...]:
+        return tuple(self.levels[self.level_start[subclass_id]:self.level_start[subclass_id + 1]])
+
+    def parent_of(self, subclass_id: int) -> str:
+        return self.parent_names[self.subclass_parent[subclass_id]]
+
+    def label(self, subclass_id: int, final_levels: int, show_parent: bool) -> str:
+        return subclass_label(
+            self.subclass_names[subclass_id],
+            self.parent_of(subclass_id),
+            final_levels,
+            show_parent,
+        )
+
+
+def catalog_cache_path(breakpoints_path: str) -> str:
+    """Return where the compiled catalog for a breakpoints CSV is cached."""
+    return os.path.splitext(breakpoints_path)[0] + CATALOG_CACHE_SUFFIX
+
+
+def _catalog_cache_key(breakpoints_path: str, themes_path: str) -> bytes:
+    digest = hashlib.sha256(f"catalog-v{CATALOG_SCHEMA_VERSION}".encode())
+    for path in (breakpoints_path, themes_path):
+        with open(path, "rb") as f:
+            content = f.read()
+        digest.update(len(content).to_bytes(8, "big"))
+        digest.update(content)
+    return digest.hexdigest().encode()
+
+
+def load_cached_catalog(breakpoints_path: str, themes_path: str) -> Optional[Catalog]:
+    """Return the cached catalog for these CSVs, or None when there is no valid cache.
+
+    The cache key hashes the content of both CSVs together with
+    ``CATALOG_SCHEMA_VERSION``, so edited data or an upgraded package never
+    reuses a stale catalog.
+    """
+    try:
+        key = _catalog_cache_key(breakpoints_path, themes_path)
+        with open(catalog_cache_path(breakpoints_path), "rb") as f:
+            if f.readline().rstrip(b"\n") != key:
+                return None
+            catalog = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    return catalog if isinstance(catalog, Catalog) else None
+
+
+def save_cached_catalog(breakpoints_path: str, themes_path: str, catalog: Catalog) -> None:
+    """Write the catalog cache. Failures (e.g. a read-only directory) are ignored."""
+    path = catalog_cache_path(breakpoints_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        key = _catalog_cache_key(breakpoints_path, themes_path)
+        with open(tmp_path, "wb") as f:
+            f.write(key + b"\n")
+            pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_catalog(breakpoints_path: str, themes_path: str, use_cache: bool = True) -> Catalog:
+    """Load and compile both CSVs, going through the on-disk cache when allowed."""
+    if use_cache:
+        catalog = load_cached_catalog(breakpoints_path, themes_path)
+        if catalog is not None:
+            return catalog
+
+    rows = read_breakpoint_rows(breakpoints_path)
+    themes, theme_requirements = load_themes(themes_path)
+    catalog = Catalog(rows, themes, theme_requirements)
+    if use_cache:
+        save_cached_catalog(breakpoints_path, themes_path, catalog)
+    return catalog
@@ -1,11 +1,19 @@
 import argparse
+import os
 import random
 import sys
 
 from .config import DEFAULTS
-from .data_io import load_breakpoints, load_themes
-from .logic import suggest_many
 
+# Everything else is imported where it is used, after the arguments parsed:
+# most runs load the compiled catalog from the cache and generate a few builds
+# serially, and should not pay for CSV parsing, NumPy, process pools or
+# enumeration. ``config`` holds no dataclass, so it is cheap to import.
+
+
+# Flush stdout every this many builds so piped readers see output promptly
+# without paying for a flush per line.
+FLUSH_EVERY = 100
 
 COMPOSITION_WEIGHT_DEFAULTS = getattr(
     DEFAULTS,
@@ -22,6 +30,47 @@ def _composition_weights_from_args(args) -> dict:
     }
 
 
+def generator_settings_from_args(args) -> dict:
+    """``BuildGenerator`` keyword arguments for parsed CLI options."""
+    return dict(
+        level_cap=args.level_cap,
+        show_parent_in_label=args.show_parent_in_label,
+        require_ea_if_martial=args.ea_if_martial,
+        prefer_ea_if_hybrid=args.prefer_ea_if_hybrid,
+        composition_weights=_composition_weights_from_args(args),
+        use_adjective=not args.no_theme,
+        include_blurb=not args.no_theme,
+    )
+
+
+def _parent_levels_arg(value: str):
+    # "Wizard=2-6" -> ("Wizard", (2, 6)); "Rogue=0" excludes Rogue.
+    parent, sep, bounds = value.partition("=")
+    low, _, high = bounds.partition("-")
+    try:
+        low_level = int(low)
+        high_level = int(high) if high else low_level
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected PARENT=MIN-MAX, got {value!r}")
+    if not sep or not parent:
+        raise argparse.ArgumentTypeError(f"expected PARENT=MIN-MAX, got {value!r}")
+    return parent, (low_level, high_level)
+
+
+def constraints_from_args(args):
+    """``BuildConstraints`` for parsed CLI options, or None when none were given."""
+    if not (args.include_subclass or args.require_capability or args.adjective or args.parent_levels):
+        return None
+    from .constraints import BuildConstraints
+
+    return BuildConstraints(
+        subclasses=tuple(args.include_subclass or ()),
+        capabilities=tuple(args.require_capability or ()),
+        adjective=args.adjective,
+        parent_levels=dict(args.parent_levels or ()),
+    )
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         prog="bg3-builds",
@@ -39,43 +88,180 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--hybrid-weight", type=float, default=COMPOSITION_WEIGHT_DEFAULTS["hybrid"], help="Weight for mixed martial/caster parent selection.")
     p.add_argument("--no-theme", action="store_true", help="Disable adjective in names and omit themed blurb.")
     p.add_argument("--seed", type=int, default=None, help="Random seed for reproducibility.")
+    p.add_argument("--stats", action="store_true", help="Print attempt, rejection and stage timing totals to stderr.")
+    p.add_argument("--no-cache", action="store_true", help="Always re-parse the CSVs instead of using the compiled catalog cache.")
+    p.add_argument("--distribution", action="store_true", help="Instead of generating, print the exact probability of every possible build (most likely first).")
+    p.add_argument("--numpy", action="store_true", help="Draw builds in vectorized batches (needs NumPy; same distribution, different builds per seed; ignores --workers).")
+    p.add_argument("--unique", action="store_true", help="Never print the same subclasses and levels twice.")
+    p.add_argument("--issued-file", help="File of previously issued builds to exclude; new builds are added to it. Implies --unique.")
+    p.add_argument("--include-subclass", action="append", metavar="SUBCLASS", help="Every build includes this subclass (repeatable).")
+    p.add_argument("--require-capability", action="append", metavar="CAPABILITY", help="Every build's subclasses have this capability between them (repeatable).")
+    p.add_argument("--adjective", help="Every build uses this theme adjective.")
+    p.add_argument("--parent-levels", action="append", type=_parent_levels_arg, metavar="PARENT=MIN-MAX", help="Keep a parent class's levels in this range; a MIN above 0 requires it, PARENT=0 excludes it (repeatable).")
+    p.add_argument("--theme-first", action="store_true", help="Draw the theme adjective first (uniformly), then only subclasses that can carry it.")
+    p.add_argument("--format", choices=("text", "jsonl", "csv"), default="text", help="Output format: display lines, or one JSON object / CSV row of subclass ids, levels and adjective id per build.")
+    p.add_argument("--with-names", action="store_true", help="With --format jsonl/csv, also write the build name and the adjective, subclass and parent names.")
+    p.add_argument("--workers", type=int, default=1, help="Worker processes for bulk generation. Output for a given seed does not depend on this.")
     return p
 
 
 def main(argv=None) -> int:
     argv = argv if argv is not None else sys.argv[1:]
-    args = build_parser().parse_args(argv)
-    if args.seed is not None:
-        random.seed(args.seed)
+    if argv[:1] == ["serve"]:
+        from .server import main as serve_main
 
-    try:
-        sub_bps = load_breakpoints(args.breakpoints)
-    except Exception as e:
-        print(f"Error loading breakpoint file '{args.breakpoints}': {e}", file=sys.stderr)
-        return 2
+        return serve_main(argv[1:])
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.numpy:
+        from .batch import numpy_available
+
+        if not numpy_available():
+            parser.error("--numpy needs NumPy installed (pip install numpy)")
+    if args.numpy and args.stats:
+        parser.error("--stats is not collected by the --numpy sampler")
+    unique = args.unique or args.issued_file is not None
+    if unique and args.numpy:
+        parser.error("--unique cannot be combined with --numpy")
+    if args.distribution and args.format != "text":
+        parser.error("--format only applies to generated builds, not --distribution")
+    if args.with_names and args.format == "text":
+        parser.error("--with-names requires --format jsonl or csv")
+    constraints = constraints_from_args(args)
+    if constraints is not None and (args.numpy or args.distribution):
+        parser.error("build constraints cannot be combined with --numpy or --distribution")
+    if args.theme_first and (args.numpy or args.distribution):
+        parser.error("--theme-first cannot be combined with --numpy or --distribution")
+
+    from .catalog import load_cached_catalog
+
+    catalog = None if args.no_cache else load_cached_catalog(args.breakpoints, args.themes)
+    if catalog is None:
+        from .catalog import Catalog, save_cached_catalog
+        from .data_io import load_themes, read_breakpoint_rows
+
+        try:
+            breakpoint_rows = read_breakpoint_rows(args.breakpoints)
+        except Exception as e:
+            print(f"Error loading breakpoint file '{args.breakpoints}': {e}", file=sys.stderr)
+            return 2
+
+        try:
+            themes, theme_reqs = load_themes(args.themes)
+        except Exception as e:
+            print(f"Error loading themes file '{args.themes}': {e}", file=sys.stderr)
+            return 3
+
+        catalog = Catalog(breakpoint_rows, themes, theme_reqs)
+        if not args.no_cache:
+            save_cached_catalog(args.breakpoints, args.themes, catalog)
+
+    if args.distribution:
+        from .distribution import enumerate_builds
+
+        distribution = enumerate_builds(
+            catalog,
+            level_cap=args.level_cap,
+            composition_weights=_composition_weights_from_args(args),
+            require_ea_if_martial=args.ea_if_martial,
+            prefer_ea_if_hybrid=args.prefer_ea_if_hybrid,
+        )
+        return _write_lines(_distribution_lines(catalog, distribution, args.show_parent_in_label), sys.stdout)
+
+    settings = generator_settings_from_args(args)
+    if constraints is not None:
+        from .constraints import ConstraintIndex
+
+        try:
+            ConstraintIndex(catalog, constraints, args.level_cap)
+        except ValueError as e:
+            parser.error(str(e))
+        settings["constraints"] = constraints
+    if args.theme_first:
+        settings["theme_first"] = True
+    stats = None
+    if args.stats:
+        from .stats import GenerationStats
+
+        stats = GenerationStats()
+    if unique:
+        from .generator import BuildGenerator
+        from .unique import load_issued_builds, save_issued_builds
+
+        issued = load_issued_builds(args.issued_file) if args.issued_file else set()
+        rng = random.Random(args.seed) if args.seed is not None else None
+        try:
+            builds = BuildGenerator(catalog, **settings).generate_builds(args.num, rng, stats, issued=issued)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        if args.issued_file:
+            save_issued_builds(args.issued_file, issued)
+    elif args.numpy:
+        from .batch import iter_batch_builds
+
+        builds = iter_batch_builds(catalog, n=args.num, seed=args.seed, records=True, **settings)
+    else:
+        from .parallel import iter_builds
+
+        builds = iter_builds(
+            catalog,
+            n=args.num,
+            seed=args.seed,
+            workers=args.workers,
+            stats=stats,
+            records=True,
+            **settings,
+        )
 
     try:
-        themes, theme_reqs = load_themes(args.themes)
-    except Exception as e:
-        print(f"Error loading themes file '{args.themes}': {e}", file=sys.stderr)
-        return 3
-
-    builds = suggest_many(
-        sub_bps,
-        themes,
-        theme_reqs,
-        n=args.num,
-        level_cap=args.level_cap,
-        show_parent_in_label=args.show_parent_in_label,
-        require_ea_if_martial=args.ea_if_martial,
-        prefer_ea_if_hybrid=args.prefer_ea_if_hybrid,
-        composition_weights=_composition_weights_from_args(args),
-        use_adjective=not args.no_theme,
-        include_blurb=not args.no_theme,
-    )
+        status = _write_builds(builds, sys.stdout, args.format, args.with_names)
+    except RuntimeError as e:
+        # Builds are generated as they are written, so failures surface here.
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if stats is not None:
+        for line in stats.report_lines():
+            print(line, file=sys.stderr)
+    return status
+
+
+def _distribution_lines(catalog, distribution, show_parent_in_label):
+    for build, probability in sorted(distribution.items(), key=lambda item: -item[1]):
+        core = " / ".join(
+            sorted(
+                catalog.label(catalog.subclass_ids[subclass], level, show_parent_in_label)
+                for subclass, level in build
+            )
+        )
+        yield f"{probability:.10f}", core
+
 
-    for name, line in builds:
-        print(name, line)
+def _write_lines(pairs, out) -> int:
+    return _write_all(pairs, lambda pair: out.write(f"{pair[0]} {pair[1]}\n"), out)
+
+
+def _write_builds(builds, out, fmt: str, names: bool) -> int:
+    from .export import build_writer
+
+    return _write_all(builds, build_writer(fmt, out, names), out)
+
+
+def _write_all(items, write, out) -> int:
+    try:
+        for count, item in enumerate(items, start=1):
+            write(item)
+            if count % FLUSH_EVERY == 0:
+                out.flush()
+        out.flush()
+    except BrokenPipeError:
+        # The reader went away (for example `| head`). Point stdout at devnull
+        # so the interpreter's final flush does not fail again.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, out.fileno())
     return 0
 
 
@@ -1,8 +1,9 @@
-from dataclasses import dataclass
+from typing import NamedTuple
 
 
-@dataclass(frozen=True)
-class Defaults:
+# A NamedTuple rather than a dataclass: every CLI run imports this module, and
+# dataclasses costs more to import than the rest of a cached run's startup.
+class Defaults(NamedTuple):
     level_cap: int = 12
     num_subclasses_weights: dict = None
     composition_weights: dict = None
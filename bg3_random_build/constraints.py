@@ -0,0 +1,219 @@
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from .analysis import level_reachable, martial_access_level
+from .catalog import Catalog
+
+
+@dataclass(frozen=True)
+class BuildConstraints:
+    """Requirements every generated build must meet.
+
+    All of ``subclasses`` are in the build, its subclasses' combined
+    capabilities include every one of ``capabilities``, and its theme is
+    ``adjective``. ``parent_levels`` maps parent classes to an inclusive
+    ``(min, max)`` level range: a minimum above 0 requires that parent class,
+    and a maximum of 0 excludes it.
+    """
+
+    subclasses: Tuple[str, ...] = ()
+    capabilities: Tuple[str, ...] = ()
+    adjective: Optional[str] = None
+    parent_levels: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+
+def _covers(targets: Sequence[int], provided: int) -> bool:
+    return any(target & provided == target for target in targets)
+
+
+# Per parent class of a parent set: the groups of its allowed subclasses that
+# provide the same constrained capabilities.
+_ParentClasses = List[Tuple[int, Tuple[int, ...]]]
+
+
+class ConstraintIndex:
+    """``BuildConstraints`` compiled against a catalog.
+
+    ``subclasses_by_capability`` is an inverted index from each capability to
+    the subclasses that have it. The capability constraint and the fixed
+    adjective's requirement alternatives are turned into target masks, and
+    the index tells which target bits each subclass provides. ``restrict``
+    uses that to split a parent set's subclasses into groups that only ever
+    form compatible combinations, so sampling never has to reject a build for
+    its subclasses or capabilities, however rare they are. The generator
+    draws final levels within ``subclass_bounds``. Only martial-gated
+    adjectives, which depend on martial access after the fill, are checked by
+    ``accepts``; targets that only come from martial-gated alternatives are
+    dropped for parent sets where no subclass can reach martial access under
+    the cap.
+
+    Raises ValueError for subclass, capability, adjective or parent names the
+    catalog does not know.
+    """
+
+    def __init__(self, catalog: Catalog, constraints: BuildConstraints, level_cap: int):
+        self.catalog = catalog
+        self.constraints = constraints
+        self.level_cap = level_cap
+        theme_index = catalog.theme_index
+
+        unknown = [name for name in constraints.subclasses if name not in catalog.subclass_ids]
+        if unknown:
+            raise ValueError(f"Unknown subclass(es): {', '.join(unknown)}")
+        unknown = [name for name in constraints.capabilities if name not in theme_index.bits]
+        if unknown:
+            raise ValueError(f"Unknown capability(ies): {', '.join(unknown)}")
+        unknown = [name for name in constraints.parent_levels if name not in catalog.parent_ids]
+        if unknown:
+            raise ValueError(f"Unknown parent class(es): {', '.join(unknown)}")
+        if constraints.adjective is not None and constraints.adjective not in catalog.themes:
+            raise ValueError(f"Unknown adjective: {constraints.adjective}")
+
+        self.subclasses_by_capability: Dict[str, Tuple[int, ...]] = {
+            capability: tuple(i for i in range(len(catalog)) if catalog.capability_masks[i] & bit)
+            for capability, bit in theme_index.bits.items()
+        }
+
+        # The build needs every bit of at least one target mask.
+        required = theme_index.mask_for(constraints.capabilities)
+        alternatives = ()
+        if constraints.adjective is not None:
+            alternatives = dict(theme_index.requirements)[constraints.adjective]
+        self.targets = sorted({required | mask for mask, _ in alternatives} or {required})
+        # Targets that need martial access (Extra Attack or Rogue 4) to count.
+        self.gated_targets = frozenset(
+            {required | mask for mask, needs_martial in alternatives if needs_martial}
+            - {required | mask for mask, needs_martial in alternatives if not needs_martial}
+        )
+        self._ungated_targets = [target for target in self.targets if target not in self.gated_targets]
+        target_bits = 0
+        for target in self.targets:
+            target_bits |= target
+        self._provided = [0] * len(catalog)
+        for capability, bit in theme_index.bits.items():
+            if bit & target_bits:
+                for subclass_id in self.subclasses_by_capability[capability]:
+                    self._provided[subclass_id] |= bit
+
+        self.level_bounds: Dict[str, Tuple[int, int]] = {
+            parent: (max(low, 0), min(high, level_cap)) for parent, (low, high) in constraints.parent_levels.items()
+        }
+        self.required_parents = {parent for parent, (low, _) in self.level_bounds.items() if low > 0}
+        self.excluded_parents = {parent for parent, (low, high) in self.level_bounds.items() if high <= 0 or low > high}
+
+        # Breakpoints above a parent's maximum can never be kept.
+        self.level_options: List[Tuple[int, ...]] = []
+        # Final level range of each subclass, or None without level ranges.
+        self.subclass_bounds: Optional[List[Tuple[int, int]]] = [] if self.level_bounds else None
+        for subclass_id in range(len(catalog)):
+            low, high = self.level_bounds.get(catalog.parent_of(subclass_id), (0, level_cap))
+            self.level_options.append(tuple(level for level in catalog.level_options(subclass_id) if level <= high))
+            if self.subclass_bounds is not None:
+                self.subclass_bounds.append((low, high))
+
+        self._classes: Dict[str, _ParentClasses] = {}
+        self._lowest: Dict[str, int] = {}
+        self._all_groups: Dict[str, Tuple[int, ...]] = {}
+        self._parent_provides: Dict[str, int] = {}
+        # Lowest level at which the parent gives martial access, if any.
+        self._martial_level: Dict[str, Optional[int]] = {}
+        for parent, subclass_ids in zip(catalog.parent_names, catalog.subclasses_by_parent):
+            required_here = [i for i in subclass_ids if catalog.subclass_names[i] in constraints.subclasses]
+            if required_here:
+                self.required_parents.add(parent)
+            if len(required_here) > 1:
+                # Builds take one subclass per parent class, so none can qualify.
+                self.excluded_parents.add(parent)
+            allowed = [i for i in (required_here or subclass_ids) if self.level_options[i]]
+            # Allowed subclasses grouped by the target bits they provide, and
+            # the lowest level the parent can take.
+            groups: Dict[int, List[int]] = {}
+            for subclass_id in allowed:
+                groups.setdefault(self._provided[subclass_id], []).append(subclass_id)
+            self._classes[parent] = [(mask, tuple(group)) for mask, group in groups.items()]
+            self._all_groups[parent] = tuple(allowed)
+            self._parent_provides[parent] = 0
+            for mask in groups:
+                self._parent_provides[parent] |= mask
+            if allowed:
+                self._lowest[parent] = max(
+                    self.level_bounds.get(parent, (0, 0))[0],
+                    min(self.level_options[i][0] for i in allowed),
+                )
+                access = {i: martial_access_level(parent, catalog.ea_thresholds[i]) for i in allowed}
+                martial_levels = [
+                    max(self._lowest[parent], self.level_options[i][0], access[i]) for i in allowed if access[i]
+                ]
+                high = self.level_bounds.get(parent, (0, level_cap))[1]
+                martial_levels = [level for level in martial_levels if level <= min(high, level_cap)]
+                self._martial_level[parent] = min(martial_levels) if martial_levels else None
+
+    @property
+    def target_key(self) -> Tuple[Tuple[int, ...], FrozenSet[int]]:
+        """What ``restrict`` depends on besides the catalog and the other constraints."""
+        return tuple(self.targets), self.gated_targets
+
+    def _martial_reachable(self, parents: Sequence[str]) -> bool:
+        # Every parent starts at its lowest level; see analysis.level_reachable.
+        lowest = sum(self._lowest[parent] for parent in parents)
+        return any(
+            level_reachable(lowest, self._lowest[parent], self._martial_level[parent] or 0, self.level_cap)
+            for parent in parents
+        )
+
+    def restrict(self, parents: Sequence[str]) -> List[Tuple[Tuple[int, ...], ...]]:
+        """Split a parent set into subclass groups whose every combination is compatible.
+
+        Each returned tuple holds one group per parent, in ``parents`` order;
+        together they cover every compatible combination exactly once.
+        """
+        if self.required_parents.difference(parents) or self.excluded_parents.intersection(parents):
+            return []
+        if not all(self._classes[parent] for parent in parents):
+            return []
+        if sum(self._lowest[parent] for parent in parents) > self.level_cap:
+            return []
+        targets = self.targets
+        if self.gated_targets and not self._martial_reachable(parents):
+            targets = self._ungated_targets
+            if not targets:
+                return []
+        # What the parents from each position onwards can still provide.
+        reachable = [0] * (len(parents) + 1)
+        for index in range(len(parents) - 1, -1, -1):
+            reachable[index] = reachable[index + 1] | self._parent_provides[parents[index]]
+        out: List[Tuple[Tuple[int, ...], ...]] = []
+        self._split(parents, targets, 0, 0, (), reachable, out)
+        return out
+
+    def _split(self, parents, targets, index, provided, prefix, reachable, out) -> None:
+        # Walk the parents in order, branching on the target bits each one
+        # adds. Once a target is covered the remaining parents are free, so a
+        # parent set yields a handful of group tuples instead of one per
+        # combination of subclass groups.
+        if _covers(targets, provided):
+            out.append(prefix + tuple(self._all_groups[parent] for parent in parents[index:]))
+            return
+        if index == len(parents) or not _covers(targets, provided | reachable[index]):
+            return
+        branches: Dict[int, List[int]] = {}
+        for mask, group in self._classes[parents[index]]:
+            branches.setdefault(provided | mask, []).extend(group)
+        for branch_provided, group in branches.items():
+            self._split(parents, targets, index + 1, branch_provided, prefix + (tuple(group),), reachable, out)
+
+    def accepts(self, chosen: Sequence[int], has_martial_access: bool) -> bool:
+        """Check that the fixed adjective fits, which may depend on martial access.
+
+        Everything else holds by construction: ``restrict`` picks the
+        subclasses, and the generator draws final levels within
+        ``subclass_bounds``.
+        """
+        catalog = self.catalog
+        adjective = self.constraints.adjective
+        if adjective is None:
+            return True
+        mask = 0
+        for subclass_id in chosen:
+            mask |= catalog.capability_masks[subclass_id]
+        return adjective in catalog.theme_index.fitting(mask, has_martial_access)
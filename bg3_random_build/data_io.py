@@ -1,4 +1,3 @@
-import csv
 import os
 from typing import Dict, FrozenSet, List, Set, Tuple
 
@@ -6,6 +5,8 @@ from .models import SubBreakpoint
 
 
 ThemeRequirements = Dict[str, List[FrozenSet[str]]]
+# One breakpoints.csv row: subclass, valid levels, parent class, capabilities.
+BreakpointRow = Tuple[str, List[int], str, FrozenSet[str]]
 
 
 def _split_semicolon_values(raw: str) -> List[str]:
@@ -13,6 +14,18 @@ def _split_semicolon_values(raw: str) -> List[str]:
 
 
 def load_breakpoints(path: str) -> List[SubBreakpoint]:
+    out: List[SubBreakpoint] = []
+    for subclass, levels, parent_class, capabilities in read_breakpoint_rows(path):
+        for level in levels:
+            out.append(SubBreakpoint(subclass, level, parent_class, capabilities))
+    return out
+
+
+def read_breakpoint_rows(path: str) -> List[BreakpointRow]:
+    """Read and validate breakpoints.csv without expanding rows per level."""
+    # Imported here: runs that load the compiled catalog never parse a CSV.
+    import csv
+
     if not os.path.exists(path):
         raise FileNotFoundError(f"Breakpoint file not found: {path}")
 
@@ -20,7 +33,7 @@ def load_breakpoints(path: str) -> List[SubBreakpoint]:
     if ext != ".csv":
         raise ValueError("Unsupported breakpoint file type. Use .csv")
 
-    out: List[SubBreakpoint] = []
+    out: List[BreakpointRow] = []
     seen_subclasses: Set[str] = set()
     with open(path, newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -30,6 +43,8 @@ def load_breakpoints(path: str) -> List[SubBreakpoint]:
             raise ValueError(f"Breakpoint CSV is missing columns: {', '.join(sorted(missing))}")
 
         for line_number, row in enumerate(reader, start=2):
+            if any(row[column] is None for column in required_columns):
+                raise ValueError(f"Breakpoint CSV line {line_number} is missing fields")
             subclass = row["subclass"].strip()
             parent_class = row["parent_class"].strip()
             if not subclass or not parent_class:
@@ -54,13 +69,14 @@ def load_breakpoints(path: str) -> List[SubBreakpoint]:
                 raise ValueError(f"Breakpoint CSV line {line_number} contains duplicate levels")
 
             capabilities = frozenset(_split_semicolon_values(row.get("capabilities") or ""))
-            for level in levels:
-                out.append(SubBreakpoint(subclass, level, parent_class, capabilities))
+            out.append((subclass, levels, parent_class, capabilities))
 
     return out
 
 
 def load_themes(path: str) -> Tuple[Dict[str, str], ThemeRequirements]:
+    import csv
+
     if not os.path.exists(path):
         raise FileNotFoundError(f"Theme file not found: {path}")
 
@@ -74,6 +90,8 @@ def load_themes(path: str) -> Tuple[Dict[str, str], ThemeRequirements]:
             raise ValueError(f"Theme CSV is missing columns: {', '.join(sorted(missing))}")
 
         for line_number, row in enumerate(reader, start=2):
+            if any(row[column] is None for column in required_columns):
+                raise ValueError(f"Theme CSV line {line_number} is missing fields")
             adjective = row["adjective"].strip()
             if not adjective:
                 raise ValueError(f"Theme CSV line {line_number} has an empty adjective")
@@ -0,0 +1,215 @@
+import itertools
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .analysis import Pair, has_extra_attack, pair_success_weight, pair_tables, parent_role
+from .catalog import Catalog
+from .config import DEFAULTS
+from .generator import BuildKey
+from .logic import COMPOSITION_WEIGHT_DEFAULTS, fill_outcomes
+
+
+# (breakpoint levels, Extra Attack threshold or 0) of one subclass. Subclasses
+# with the same signature behave identically in breakpoint solving and filling.
+_Signature = Tuple[Tuple[int, ...], int]
+
+# Outcomes of one attempt for a subclass tuple: final levels (aligned with the
+# sorted signatures) with their probability, and the total accepted probability.
+_Kernel = Tuple[List[Tuple[Tuple[int, ...], float]], float]
+
+
+def _attempt_kernel(
+    signatures: Tuple[_Signature, ...],
+    want_ea_probability: float,
+    level_cap: int,
+    fill_cache: Dict[tuple, List[Tuple[Tuple[int, ...], float]]],
+) -> _Kernel:
+    # One attempt with these subclasses: a uniform breakpoint assignment under
+    # the cap, the Extra Attack coin flip, the fill, and the Extra Attack check.
+    thresholds = tuple(th for _, th in signatures)
+    assignments = [
+        levels
+        for levels in itertools.product(*(options for options, _ in signatures))
+        if sum(levels) <= level_cap
+    ]
+    if not assignments:
+        return [], 0.0
+
+    outcomes: Dict[Tuple[int, ...], float] = {}
+    branches = [(True, want_ea_probability), (False, 1.0 - want_ea_probability)]
+    for levels in assignments:
+        for want_ea, branch in branches:
+            if branch <= 0:
+                continue
+            key = (levels, thresholds, want_ea)
+            filled = fill_cache.get(key)
+            if filled is None:
+                filled = fill_cache[key] = fill_outcomes(levels, thresholds, want_ea, level_cap)
+            for finals, probability in filled:
+                if want_ea and not has_extra_attack(finals, thresholds):
+                    continue
+                outcomes[finals] = outcomes.get(finals, 0.0) + branch * probability / len(assignments)
+    return list(outcomes.items()), sum(outcomes.values())
+
+
+def _want_ea_probability(parents: Tuple[str, ...], require_ea_if_martial: bool, prefer_ea_if_hybrid: float) -> float:
+    role = parent_role(parents)
+    if role == "martial":
+        return 1.0 if require_ea_if_martial else 0.0
+    if role == "hybrid":
+        return min(max(prefer_ea_if_hybrid, 0.0), 1.0)
+    return 0.0
+
+
+def outcome_probabilities(
+    catalog: Catalog,
+    level_cap: int = DEFAULTS.level_cap,
+    num_subclass_weights: Dict[int, float] = None,
+    composition_weights: Dict[str, float] = None,
+    require_ea_if_martial: bool = DEFAULTS.require_ea_if_martial,
+    prefer_ea_if_hybrid: float = DEFAULTS.prefer_ea_if_hybrid,
+) -> Dict[Pair, float]:
+    """Return the share of generated builds with each (subclass count, composition).
+
+    Unlike the draw probabilities of ``analyze_config``, this accounts for
+    draws whose attempts all fail, from the exact success rate of an attempt
+    for each pair. Only the acceptance of each attempt is computed, not the
+    builds themselves, memoized by the breakpoint/Extra Attack signatures of
+    the subclasses; the vanilla catalog still takes a few seconds.
+    """
+    if num_subclass_weights is None:
+        num_subclass_weights = DEFAULTS.num_subclasses_weights
+    if composition_weights is None:
+        composition_weights = COMPOSITION_WEIGHT_DEFAULTS
+
+    tables, weights, _, kept_shares = pair_tables(
+        catalog,
+        level_cap,
+        num_subclass_weights,
+        composition_weights,
+        require_ea_if_martial,
+        prefer_ea_if_hybrid,
+    )
+    # Per parent: each distinct subclass signature with its subclass count.
+    signatures_by_parent = {
+        parent: list(Counter((catalog.level_options(i), catalog.ea_thresholds[i]) for i in subclass_ids).items())
+        for parent, subclass_ids in zip(catalog.parent_names, catalog.subclasses_by_parent)
+    }
+    kernels: Dict[tuple, float] = {}
+    fill_cache: Dict[tuple, List[Tuple[Tuple[int, ...], float]]] = {}
+
+    pair_weights: Dict[Pair, float] = {}
+    for pair, (parent_sets, cum_weights) in tables.items():
+        accepted = 0.0
+        for parents in parent_sets:
+            want_ea_probability = _want_ea_probability(parents, require_ea_if_martial, prefer_ea_if_hybrid)
+            for combination in itertools.product(*(signatures_by_parent[parent] for parent in parents)):
+                count = 1
+                for _, subclasses in combination:
+                    count *= subclasses
+                key = (tuple(sorted(signature for signature, _ in combination)), want_ea_probability)
+                kernel_accepted = kernels.get(key)
+                if kernel_accepted is None:
+                    kernel_accepted = kernels[key] = _attempt_kernel(
+                        key[0], want_ea_probability, level_cap, fill_cache
+                    )[1]
+                accepted += count * kernel_accepted
+        if accepted > 0:
+            success = accepted / cum_weights[-1] * kept_shares[pair]
+            pair_weights[pair] = pair_success_weight(weights[pair], success)
+
+    total = sum(pair_weights.values())
+    return {pair: weight / total for pair, weight in pair_weights.items()}
+
+
+def enumerate_builds(
+    catalog: Catalog,
+    level_cap: int = DEFAULTS.level_cap,
+    num_subclass_weights: Dict[int, float] = None,
+    composition_weights: Dict[str, float] = None,
+    require_ea_if_martial: bool = DEFAULTS.require_ea_if_martial,
+    prefer_ea_if_hybrid: float = DEFAULTS.prefer_ea_if_hybrid,
+    max_subclasses: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> Optional[Dict[BuildKey, float]]:
+    """Return the probability of every build ``BuildGenerator`` can produce.
+
+    Walks every subclass combination, breakpoint assignment and fill outcome
+    instead of sampling, so the result has no sampling noise; probabilities are
+    only subject to float rounding. They are conditional on ``generate_one``
+    returning a build and account for its per-draw attempt limit. Names and
+    themes are not part of the key; only the final level of each subclass is.
+
+    Attempt outcomes are memoized by the breakpoint and Extra Attack signature
+    of the subclasses, which many combinations share, and fills by their
+    starting levels. ``max_subclasses`` skips larger subclass counts (their
+    probability is then missing from the result) to keep runs short. With
+    ``limit``, enumeration stops and None is returned as soon as more than
+    ``limit`` distinct builds turn up.
+    """
+    if num_subclass_weights is None:
+        num_subclass_weights = DEFAULTS.num_subclasses_weights
+    if composition_weights is None:
+        composition_weights = COMPOSITION_WEIGHT_DEFAULTS
+
+    tables, weights, _, kept_shares = pair_tables(
+        catalog,
+        level_cap,
+        num_subclass_weights,
+        composition_weights,
+        require_ea_if_martial,
+        prefer_ea_if_hybrid,
+    )
+    groups_by_parent = dict(zip(catalog.parent_names, catalog.subclasses_by_parent))
+    signatures: List[_Signature] = [
+        (catalog.level_options(i), catalog.ea_thresholds[i]) for i in range(len(catalog))
+    ]
+    kernels: Dict[tuple, _Kernel] = {}
+    fill_cache: Dict[tuple, List[Tuple[Tuple[int, ...], float]]] = {}
+
+    pair_results = []
+    distinct = set()
+    for (k, comp_target), (parent_sets, cum_weights) in tables.items():
+        if max_subclasses is not None and k > max_subclasses:
+            continue
+        builds: Dict[BuildKey, float] = {}
+        accepted = 0.0
+        for parents in parent_sets:
+            want_ea_probability = _want_ea_probability(parents, require_ea_if_martial, prefer_ea_if_hybrid)
+            for chosen in itertools.product(*(groups_by_parent[parent] for parent in parents)):
+                order = sorted(chosen, key=signatures.__getitem__)
+                key = (tuple(signatures[i] for i in order), want_ea_probability)
+                kernel = kernels.get(key)
+                if kernel is None:
+                    kernel = kernels[key] = _attempt_kernel(key[0], want_ea_probability, level_cap, fill_cache)
+                outcomes, kernel_accepted = kernel
+                if not outcomes:
+                    continue
+                accepted += kernel_accepted
+                names = [catalog.subclass_names[i] for i in order]
+                by_name = sorted(range(len(order)), key=names.__getitem__)
+                for finals, probability in outcomes:
+                    build = tuple((names[j], finals[j]) for j in by_name)
+                    builds[build] = builds.get(build, 0.0) + probability
+            if limit is not None and len(builds) > limit:
+                return None
+        if limit is not None:
+            distinct.update(builds)
+            if len(distinct) > limit:
+                return None
+        if accepted <= 0:
+            continue
+        # Every subclass tuple of the pair is equally likely per attempt, so
+        # 1 / cum_weights[-1] is the attempt probability of each one, once the
+        # attempt did not land on a dropped parent set.
+        success = accepted / cum_weights[-1] * kept_shares[(k, comp_target)]
+        pair_weight = pair_success_weight(weights[(k, comp_target)], success)
+        pair_results.append((pair_weight, accepted, builds))
+
+    total = sum(pair_weight for pair_weight, _, _ in pair_results)
+    distribution: Dict[BuildKey, float] = {}
+    for pair_weight, accepted, builds in pair_results:
+        scale = pair_weight / total / accepted
+        for build, probability in builds.items():
+            distribution[build] = distribution.get(build, 0.0) + probability * scale
+    return distribution
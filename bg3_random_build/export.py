@@ -0,0 +1,96 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, TextIO
+
+from .models import Build
+
+if TYPE_CHECKING:
+    from .catalog import Catalog
+
+
+BUILD_FORMATS = ("text", "jsonl", "csv")
+
+# Multi-value CSV cells are semicolon-separated, like the input CSVs, and
+# aligned with each other (sorted by subclass id). The name columns are only
+# written with ``names=True``.
+CSV_COLUMNS = ("subclass_ids", "levels", "adjective_id")
+CSV_NAME_COLUMNS = ("name", "adjective", "subclasses", "parents")
+
+
+@lru_cache(maxsize=8)
+def _adjective_ids(catalog: "Catalog") -> Dict[str, int]:
+    # A hot-reloading stream sees a few catalogs at most.
+    return {adjective: i for i, adjective in enumerate(catalog.themes)}
+
+
+def build_record(build: Build, names: bool = False) -> Dict[str, object]:
+    """The machine-readable fields of a build; subclasses are sorted by id.
+
+    ``subclass_ids`` index ``catalog.subclass_names`` and ``adjective_id``
+    indexes ``catalog.themes``; it is None when the build was generated
+    without a theme. ``names=True`` adds the display name and the adjective,
+    subclass and parent names.
+    """
+    catalog = build.catalog
+    picks = sorted(zip(build.subclass_ids, build.levels))
+    subclass_ids = [subclass_id for subclass_id, _ in picks]
+    record: Dict[str, object] = {
+        "subclass_ids": subclass_ids,
+        "levels": [level for _, level in picks],
+        "adjective_id": _adjective_ids(catalog)[build.adjective] if build.use_adjective else None,
+    }
+    if names:
+        record["name"] = build.name
+        record["adjective"] = build.adjective if build.use_adjective else None
+        record["subclasses"] = [catalog.subclass_names[subclass_id] for subclass_id in subclass_ids]
+        record["parents"] = [catalog.parent_of(subclass_id) for subclass_id in subclass_ids]
+    return record
+
+
+def _csv_row(build: Build, names: bool) -> tuple:
+    record = build_record(build, names)
+    row = (
+        ";".join(map(str, record["subclass_ids"])),
+        ";".join(map(str, record["levels"])),
+        "" if record["adjective_id"] is None else record["adjective_id"],
+    )
+    if names:
+        row += (
+            record["name"],
+            record["adjective"] or "",
+            ";".join(record["subclasses"]),
+            ";".join(record["parents"]),
+        )
+    return row
+
+
+def build_writer(fmt: str, out: TextIO, names: bool = False) -> Callable[[Build], None]:
+    """Return a function writing one build to ``out`` in ``fmt`` (one of ``BUILD_FORMATS``).
+
+    Only ``text`` formats the display line; ``jsonl`` and ``csv`` write the
+    fields of ``build_record``, with the names only when ``names`` is set.
+    The CSV header is written immediately.
+    """
+    if fmt == "text":
+        return lambda build: out.write(f"{build.name} {build.line}\n")
+    # The serializers are imported here, so text output does not load them.
+    if fmt == "jsonl":
+        import json
+
+        return lambda build: out.write(json.dumps(build_record(build, names)) + "\n")
+    if fmt == "csv":
+        import csv
+
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(CSV_COLUMNS + CSV_NAME_COLUMNS if names else CSV_COLUMNS)
+        return lambda build: writer.writerow(_csv_row(build, names))
+    raise ValueError(f"unknown build format {fmt!r}; expected one of {', '.join(BUILD_FORMATS)}")
+
+
+def write_builds(builds: Iterable[Build], out: TextIO, fmt: str = "jsonl", names: bool = False) -> int:
+    """Write builds to ``out`` in ``fmt`` and return how many were written."""
+    write = build_writer(fmt, out, names)
+    count = 0
+    for build in builds:
+        write(build)
+        count += 1
+    return count
@@ -0,0 +1,676 @@
+import copy
+import itertools
+import random
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
+
+from .analysis import (
+    ATTEMPTS_PER_PAIR,
+    ConfigAnalysis,
+    has_extra_attack,
+    has_martial_access,
+    martial_access_level,
+    pair_tables,
+    parent_role,
+    parent_signature,
+)
+from .catalog import Catalog
+from .config import DEFAULTS
+from .data_io import ThemeRequirements
+from .logic import (
+    COMPOSITION_WEIGHT_DEFAULTS,
+    _resolve_rng,
+    fill_outcomes,
+    level_combo_table,
+    pick_name_words,
+    sample_level_combo,
+)
+from .models import Build, SubBreakpoint
+from .stats import GenerationStats, no_stage
+
+if TYPE_CHECKING:
+    from .constraints import BuildConstraints
+
+
+class GenerationStopped(RuntimeError):
+    """Raised when a ``stop`` callback ends generation before a build was found."""
+
+
+# A build as (subclass, final level) pairs sorted by subclass name: what makes
+# two builds the same, whatever their names and themes.
+BuildKey = Tuple[Tuple[str, int], ...]
+
+# A composition table for the generator: each parent set as a tuple of subclass
+# id groups (one group per parent), with cumulative combination counts.
+SubclassGroupTable = Tuple[List[Tuple[Tuple[int, ...], ...]], List[int]]
+
+
+class BuildGenerator:
+    """Generate builds from a compiled ``Catalog``.
+
+    ``suggest_build`` is a thin wrapper around this class. Create a generator
+    directly when producing many builds with the same data and settings so the
+    subclass, parent, Extra Attack and theme indexes are only built once. Use
+    ``from_breakpoints`` to compile the catalog from ``load_breakpoints`` and
+    ``load_themes`` output.
+
+    The sampling loop works on subclass ids and plain level lists; names and
+    display strings are only produced for the accepted build.
+
+    ``constraints`` (a ``BuildConstraints``) limits every build to compatible
+    subclasses, capabilities, theme and parent levels; see
+    ``constraints.ConstraintIndex``. The (count, composition) draw keeps its
+    weights over the outcomes that can meet the constraints.
+
+    With ``theme_first=True`` each build draws its adjective first, from
+    ``theme_weights`` (uniform over all themes when None), and then a build
+    that can carry it, using per-theme constrained tables built on first use.
+    Rare themes then come up as often as their weight says instead of almost
+    never.
+
+    Randomness comes from ``rng`` (the shared ``random`` module state when it is
+    None). Pass a ``random.Random`` per generator, or per ``generate`` call, to
+    get independent reproducible streams for threads or user sessions.
+    """
+
+    def __init__(
+        self,
+        catalog: Catalog,
+        level_cap: int = DEFAULTS.level_cap,
+        num_subclass_weights: Dict[int, float] = None,
+        composition_weights: Dict[str, float] = None,
+        max_global_attempts: int = 800,
+        show_parent_in_label: bool = DEFAULTS.show_parent_in_label,
+        require_ea_if_martial: bool = DEFAULTS.require_ea_if_martial,
+        prefer_ea_if_hybrid: float = DEFAULTS.prefer_ea_if_hybrid,
+        name_max_hooks: int = DEFAULTS.name_max_hooks,
+        use_adjective: bool = DEFAULTS.use_adjective,
+        include_blurb: bool = True,
+        rng: Optional[random.Random] = None,
+        constraints: Optional["BuildConstraints"] = None,
+        theme_first: bool = False,
+        theme_weights: Optional[Dict[str, float]] = None,
+    ):
+        if num_subclass_weights is None:
+            num_subclass_weights = DEFAULTS.num_subclasses_weights
+        if composition_weights is None:
+            composition_weights = COMPOSITION_WEIGHT_DEFAULTS
+
+        self.catalog = catalog
+        self.level_cap = level_cap
+        self.num_subclass_weights = num_subclass_weights
+        self.composition_weights = composition_weights
+        self.max_global_attempts = max_global_attempts
+        self.show_parent_in_label = show_parent_in_label
+        self.require_ea_if_martial = require_ea_if_martial
+        self.prefer_ea_if_hybrid = prefer_ea_if_hybrid
+        self.name_max_hooks = name_max_hooks
+        self.use_adjective = use_adjective
+        self.include_blurb = include_blurb
+        self.rng = rng
+        self.constraints = constraints
+        self.theme_first = theme_first
+        self.theme_weights = theme_weights
+        # Breakpoint-assignment counts keyed by the sorted level options of a
+        # subclass tuple. Subclasses with the same breakpoints share a table,
+        # which keeps this cache to a few thousand small entries at most.
+        self._combo_tables: Dict[Tuple[Tuple[int, ...], ...], List[List[int]]] = {}
+        # Fill outcomes and their cumulative probabilities, keyed by the
+        # breakpoint levels, Extra Attack thresholds and Extra Attack wish.
+        # Levels stay under the cap, so this stays small.
+        self._fill_tables: Dict[tuple, Tuple[List[Tuple[int, ...]], List[float]]] = {}
+        # Final levels within the constraint level ranges and their cumulative
+        # weights, keyed by the level options, Extra Attack thresholds and
+        # ranges of a subclass tuple and the Extra Attack wish. ``None`` when
+        # no breakpoint assignment under the cap can end within the ranges.
+        self._bounded_tables: Dict[tuple, Optional[Tuple[List[Tuple[int, ...]], List[float]]]] = {}
+        self._index_catalog(None)
+
+    def with_catalog(self, catalog: Catalog) -> "BuildGenerator":
+        """Return a generator with these settings for an updated catalog.
+
+        Only the indexes the update can have changed are rebuilt: the
+        breakpoint and fill caches never depend on the catalog, the parent-set
+        tables carry over while every parent class keeps its subclass count and
+        level limits, and the subclass group tables while the subclasses
+        compile to the same ids, levels and capability bits and, for
+        constrained and per-theme tables, the adjective's requirement targets
+        are unchanged. This generator keeps its own catalog, so builds in
+        progress on it are unaffected. Raises ValueError when the settings name
+        something the new catalog no longer has.
+        """
+        generator = copy.copy(self)
+        generator.catalog = catalog
+        generator._index_catalog(self)
+        return generator
+
+    def _index_catalog(self, previous: Optional["BuildGenerator"]) -> None:
+        # Everything derived from the catalog. ``previous`` is a generator with
+        # the same settings on an earlier catalog to take unchanged parts from.
+        catalog = self.catalog
+        constraints = self.constraints
+        self._constraint_index = None
+        if constraints is not None:
+            from .constraints import ConstraintIndex
+
+            self._constraint_index = ConstraintIndex(catalog, constraints, self.level_cap)
+        # Theme-first mode: adjectives with cumulative weights, and one
+        # generator per adjective, built on first use, whose tables only hold
+        # subclass groups that can carry that adjective. Generators with the
+        # same requirement targets share tables through _theme_pair_tables.
+        # Threads may share this generator, so the table is replaced whole,
+        # never changed in place, and only under _theme_lock.
+        self._theme_table: Optional[Tuple[List[str], List[float]]] = None
+        self._theme_weights: Dict[str, float] = {}
+        self._dropped_themes: Set[str] = set()
+        self._theme_generators: Dict[str, BuildGenerator] = {}
+        self._theme_pair_tables: Dict[tuple, tuple] = {}
+        self._theme_lock = threading.Lock()
+        if self.theme_first:
+            theme_weights = self.theme_weights
+            if constraints is not None and constraints.adjective is not None:
+                theme_weights = {constraints.adjective: 1.0}
+            elif theme_weights is None:
+                theme_weights = dict.fromkeys(catalog.themes, 1.0)
+            unknown = [adjective for adjective in theme_weights if adjective not in catalog.themes]
+            if unknown:
+                raise ValueError(f"Unknown adjective(s): {', '.join(unknown)}")
+            self._theme_weights = {a: w for a, w in theme_weights.items() if w > 0}
+            self._theme_table = self._cumulative_themes()
+
+        subclass_ids = range(len(catalog))
+        if self._constraint_index is not None:
+            self._level_options = self._constraint_index.level_options
+            self._level_bounds = self._constraint_index.subclass_bounds
+        else:
+            self._level_options = [catalog.level_options(i) for i in subclass_ids]
+            self._level_bounds = None
+        self._ea_thresholds = catalog.ea_thresholds
+        self._capability_masks = catalog.capability_masks
+        self._parents = [catalog.parent_of(i) for i in subclass_ids]
+        self._martial_access = [
+            martial_access_level(parent, threshold) for parent, threshold in zip(self._parents, catalog.ea_thresholds)
+        ]
+
+        same_subclasses = previous is not None and catalog.same_subclasses(previous.catalog)
+        if same_subclasses or (
+            previous is not None and parent_signature(catalog) == parent_signature(previous.catalog)
+        ):
+            self._parent_set_tables = previous._parent_set_tables
+        else:
+            # Every feasible (subclass count, composition) pair with its
+            # parent-set table; see analysis.pair_tables. Drawing from these
+            # directly is what the old retry loop converged to. Parent sets
+            # that could never fit are left out, but a draw of one still
+            # costs an attempt, so the odds of each pair are unchanged.
+            self._parent_set_tables = pair_tables(
+                catalog,
+                self.level_cap,
+                self.num_subclass_weights,
+                self.composition_weights,
+                self.require_ea_if_martial,
+                self.prefer_ea_if_hybrid,
+            )
+        # Constrained tables also depend on the adjective's requirement
+        # targets, which a themes edit can change.
+        if same_subclasses and (
+            self._constraint_index is None
+            or self._constraint_index.target_key == previous._constraint_index.target_key
+        ):
+            self._composition_tables = previous._composition_tables
+            self._infeasible = previous._infeasible
+            self._kept_shares = previous._kept_shares
+            self._pairs = previous._pairs
+            self._pair_cum_weights = previous._pair_cum_weights
+        else:
+            self._index_pairs()
+        if same_subclasses:
+            # Keyed by requirement targets, so entries stay valid across themes edits.
+            self._theme_pair_tables = previous._theme_pair_tables
+
+    def _index_pairs(self) -> None:
+        tables, pair_weights, infeasible, kept_shares = self._parent_set_tables
+        self._infeasible = dict(infeasible)
+        if self._constraint_index is not None:
+            self._composition_tables = self._constrained_tables(tables)
+            for pair in tables:
+                if pair not in self._composition_tables:
+                    self._infeasible[pair] = "constraints"
+            # Constrained draws are weighted over compatible combinations only.
+            self._kept_shares: Dict[Tuple[int, str], float] = {}
+        else:
+            self._kept_shares = {pair: share for pair, share in kept_shares.items() if share < 1.0}
+            groups_by_parent = dict(zip(self.catalog.parent_names, self.catalog.subclasses_by_parent))
+            self._composition_tables: Dict[Tuple[int, str], SubclassGroupTable] = {
+                pair: (
+                    [tuple(groups_by_parent[parent] for parent in parents) for parents in parent_sets],
+                    cum_weights,
+                )
+                for pair, (parent_sets, cum_weights) in tables.items()
+            }
+        self._pairs = list(self._composition_tables)
+        self._pair_cum_weights = list(itertools.accumulate(pair_weights[pair] for pair in self._pairs))
+
+    def _constrained_tables(self, tables) -> Dict[Tuple[int, str], SubclassGroupTable]:
+        # Swap each parent set for the subclass groups that meet the
+        # constraints, weighted by their combination counts so compatible
+        # combinations stay equally likely within a pair.
+        out: Dict[Tuple[int, str], SubclassGroupTable] = {}
+        for pair, (parent_sets, _) in tables.items():
+            group_sets: List[Tuple[Tuple[int, ...], ...]] = []
+            cum_weights: List[int] = []
+            total = 0
+            for parents in parent_sets:
+                for groups in self._constraint_index.restrict(parents):
+                    weight = 1
+                    for group in groups:
+                        weight *= len(group)
+                    total += weight
+                    group_sets.append(groups)
+                    cum_weights.append(total)
+            if group_sets:
+                out[pair] = (group_sets, cum_weights)
+        return out
+
+    def _cumulative_themes(self) -> Tuple[List[str], List[float]]:
+        adjectives = [a for a in self._theme_weights if a not in self._dropped_themes]
+        return adjectives, list(itertools.accumulate(self._theme_weights[a] for a in adjectives))
+
+    def _theme_generator(self, adjective: str) -> "BuildGenerator":
+        generator = self._theme_generators.get(adjective)
+        if generator is None:
+            with self._theme_lock:
+                generator = self._theme_generators.get(adjective)
+                if generator is None:
+                    generator = self._new_theme_generator(adjective)
+                    if not generator._pairs:
+                        # No subclass set can carry this theme; never draw it again.
+                        self._dropped_themes.add(adjective)
+                        self._theme_table = self._cumulative_themes()
+                    self._theme_generators[adjective] = generator
+        return generator
+
+    def _new_theme_generator(self, adjective: str) -> "BuildGenerator":
+        # A copy with the adjective added to the constraints. It shares the
+        # parent-set tables and the breakpoint and fill caches, which do not
+        # depend on the theme, so only the constrained tables are rebuilt.
+        # Call with _theme_lock held.
+        import dataclasses
+
+        from .constraints import BuildConstraints, ConstraintIndex
+
+        generator = copy.copy(self)
+        generator.theme_first = False
+        generator._theme_table = None
+        generator._theme_weights = {}
+        generator._dropped_themes = set()
+        generator._theme_generators = {}
+        generator._theme_pair_tables = {}
+        generator._theme_lock = threading.Lock()
+        generator.constraints = dataclasses.replace(self.constraints or BuildConstraints(), adjective=adjective)
+        generator._constraint_index = ConstraintIndex(self.catalog, generator.constraints, self.level_cap)
+        generator._level_options = generator._constraint_index.level_options
+        generator._level_bounds = generator._constraint_index.subclass_bounds
+        # Themes with the same requirements get the same tables.
+        key = generator._constraint_index.target_key
+        tables = self._theme_pair_tables.get(key)
+        if tables is None:
+            generator._index_pairs()
+            tables = self._theme_pair_tables[key] = (
+                generator._composition_tables,
+                generator._infeasible,
+                generator._kept_shares,
+                generator._pairs,
+                generator._pair_cum_weights,
+            )
+        else:
+            (
+                generator._composition_tables,
+                generator._infeasible,
+                generator._kept_shares,
+                generator._pairs,
+                generator._pair_cum_weights,
+            ) = tables
+        return generator
+
+    @classmethod
+    def from_breakpoints(
+        cls,
+        sub_bps: List[SubBreakpoint],
+        themes: Dict[str, str],
+        theme_requirements: ThemeRequirements,
+        **kwargs,
+    ) -> "BuildGenerator":
+        return cls(Catalog.from_breakpoints(sub_bps, themes, theme_requirements), **kwargs)
+
+    def analysis(self) -> ConfigAnalysis:
+        """Feasibility and draw probabilities of this generator's settings.
+
+        Instant, since the tables already hold them; for the share of builds
+        per outcome, use ``analysis.analyze_config(exact=True)``.
+        """
+        total = self._pair_cum_weights[-1] if self._pairs else 0.0
+        previous = 0.0
+        draw_probabilities = {}
+        for pair, cum_weight in zip(self._pairs, self._pair_cum_weights):
+            draw_probabilities[pair] = (cum_weight - previous) / total
+            previous = cum_weight
+        return ConfigAnalysis(draw_probabilities, dict(self._infeasible))
+
+    @staticmethod
+    def _choose_subclasses(table: SubclassGroupTable, rng: random.Random) -> List[int]:
+        group_sets, cum_weights = table
+        groups = rng.choices(group_sets, cum_weights=cum_weights, k=1)[0]
+        chosen = [rng.choice(group) for group in groups]
+        # Ties in the Extra Attack top-up and the dominant parent are broken by
+        # pick order, so keep it random.
+        rng.shuffle(chosen)
+        return chosen
+
+    def _find_levels(self, chosen: List[int], rng: random.Random) -> Optional[List[int]]:
+        order = sorted(range(len(chosen)), key=lambda i: self._level_options[chosen[i]])
+        key = tuple(self._level_options[chosen[i]] for i in order)
+        table = self._combo_tables.get(key)
+        if table is None:
+            table = self._combo_tables[key] = level_combo_table(self.level_cap, key)
+        sampled = sample_level_combo(table, self.level_cap, key, rng)
+        if sampled is None:
+            return None
+
+        levels = [0] * len(chosen)
+        for i, level in zip(order, sampled):
+            levels[i] = level
+        return levels
+
+    def fill_to_cap(
+        self,
+        chosen: List[int],
+        levels: List[int],
+        want_ea: bool,
+        rng: random.Random,
+    ) -> List[int]:
+        """Raise the breakpoint ``levels`` of ``chosen`` to the level cap.
+
+        Same allocation as ``logic.fill_to_cap_with_preferences``, drawn from the
+        cached list of its possible outcomes for these levels and thresholds.
+        """
+        thresholds = tuple(map(self._ea_thresholds.__getitem__, chosen))
+        outcomes, cum_weights = self._fill_table(tuple(levels), thresholds, want_ea)
+        if len(outcomes) == 1:
+            return list(outcomes[0])
+        return list(rng.choices(outcomes, cum_weights=cum_weights, k=1)[0])
+
+    def _fill_table(
+        self, levels: Tuple[int, ...], thresholds: Tuple[int, ...], want_ea: bool
+    ) -> Tuple[List[Tuple[int, ...]], List[float]]:
+        key = (levels, thresholds, want_ea)
+        table = self._fill_tables.get(key)
+        if table is None:
+            outcomes = fill_outcomes(levels, thresholds, want_ea, self.level_cap, ties_by_position=True)
+            table = self._fill_tables[key] = (
+                [finals for finals, _ in outcomes],
+                list(itertools.accumulate(probability for _, probability in outcomes)),
+            )
+        return table
+
+    def _bounded_finals(self, chosen: List[int], want_ea: bool, rng: random.Random) -> Optional[List[int]]:
+        # Breakpoints and fill drawn together, conditioned on the final levels
+        # falling within the constraint level ranges. Every breakpoint
+        # assignment under the cap is equally likely, as in _find_levels.
+        # Returns None when none can end within the ranges, which like a
+        # missed cap means the subclasses cannot form a build.
+        options = tuple(map(self._level_options.__getitem__, chosen))
+        thresholds = tuple(map(self._ea_thresholds.__getitem__, chosen))
+        bounds = tuple(map(self._level_bounds.__getitem__, chosen))
+        key = (options, thresholds, bounds, want_ea)
+        if key not in self._bounded_tables:
+            finals_list: List[Tuple[int, ...]] = []
+            weights: List[float] = []
+            for levels in itertools.product(*options):
+                if sum(levels) > self.level_cap:
+                    continue
+                outcomes, cum_weights = self._fill_table(levels, thresholds, want_ea)
+                previous = 0.0
+                for finals, cumulative in zip(outcomes, cum_weights):
+                    if all(low <= level <= high for level, (low, high) in zip(finals, bounds)):
+                        finals_list.append(finals)
+                        weights.append(cumulative - previous)
+                    previous = cumulative
+            self._bounded_tables[key] = (finals_list, list(itertools.accumulate(weights))) if finals_list else None
+        table = self._bounded_tables[key]
+        if table is None:
+            return None
+        outcomes, cum_weights = table
+        return list(rng.choices(outcomes, cum_weights=cum_weights, k=1)[0])
+
+    def _want_ea(self, chosen: List[int], rng: random.Random) -> bool:
+        comp = parent_role(map(self._parents.__getitem__, chosen))
+        return (comp == "martial" and self.require_ea_if_martial) or (
+            comp == "hybrid" and rng.random() < self.prefer_ea_if_hybrid
+        )
+
+    def _has_martial_access(self, chosen: List[int], finals: List[int]) -> bool:
+        return has_martial_access(finals, map(self._martial_access.__getitem__, chosen))
+
+    def _pick_adjective(self, chosen: List[int], finals: List[int], rng: random.Random) -> str:
+        if self.constraints is not None and self.constraints.adjective is not None:
+            return self.constraints.adjective  # ConstraintIndex.accepts checked that it fits
+        mask = 0
+        for subclass_id in chosen:
+            mask |= self._capability_masks[subclass_id]
+        return self.catalog.theme_index.pick(mask, self._has_martial_access(chosen, finals), rng)
+
+    def build(
+        self,
+        chosen: List[int],
+        finals: List[int],
+        rng: random.Random,
+        adjective: Optional[str] = None,
+    ) -> Build:
+        """Name a drawn build and return its ``Build`` record.
+
+        The theme (unless ``adjective`` was drawn first) and name words are
+        drawn now; the strings are joined on demand.
+        """
+        catalog = self.catalog
+        if adjective is None:
+            adjective = self._pick_adjective(chosen, finals, rng)
+        final_levels = {
+            (catalog.subclass_names[subclass_id], catalog.parent_of(subclass_id)): level
+            for subclass_id, level in zip(chosen, finals)
+        }
+        hooks, roles = pick_name_words(final_levels, self.name_max_hooks, rng)
+        return Build(
+            catalog,
+            tuple(chosen),
+            tuple(finals),
+            adjective,
+            hooks,
+            roles,
+            self.show_parent_in_label,
+            self.use_adjective,
+            self.include_blurb,
+        )
+
+    def check_feasible(self) -> None:
+        """Raise RuntimeError right away for settings that can never produce a build."""
+        if not len(self.catalog):
+            raise RuntimeError("No subclasses available.")
+        if not self._pairs:
+            reasons = self.analysis().messages() or [
+                "no subclass count or composition has a positive weight"
+            ]
+            raise RuntimeError("No valid combination found: " + "; ".join(reasons))
+
+    def generate_one(
+        self,
+        rng: Optional[random.Random] = None,
+        stats: Optional[GenerationStats] = None,
+        stop: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[str, str]:
+        """Generate one build as ``(name, line)``.
+
+        ``stop`` is polled before every subclass count/composition draw; once it
+        returns True, ``GenerationStopped`` is raised instead of searching on.
+        """
+        return self._generate_one(rng, stats, stop, formatted=True)
+
+    def generate_build(
+        self,
+        rng: Optional[random.Random] = None,
+        stats: Optional[GenerationStats] = None,
+        stop: Optional[Callable[[], bool]] = None,
+    ) -> Build:
+        """Like ``generate_one``, but return the ``Build`` record."""
+        return self._generate_one(rng, stats, stop, formatted=False)
+
+    def _generate_one(
+        self,
+        rng: Optional[random.Random],
+        stats: Optional[GenerationStats],
+        stop: Optional[Callable[[], bool]],
+        formatted: bool,
+    ):
+        rng = _resolve_rng(rng if rng is not None else self.rng)
+        try:
+            chosen, finals, adjective = self.draw(rng, stats, stop)
+        except GenerationStopped:
+            raise
+        except RuntimeError:
+            if stats is not None:
+                stats.failures += 1
+            raise
+        with no_stage("naming") if stats is None else stats.stage("naming"):
+            build = self.build(chosen, finals, rng, adjective)
+            result = (build.name, build.line) if formatted else build
+        if stats is not None:
+            stats.builds += 1
+        return result
+
+    def draw(
+        self,
+        rng: random.Random,
+        stats: Optional[GenerationStats],
+        stop: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[List[int], List[int], Optional[str]]:
+        """Draw one accepted build as (subclass ids, final levels, adjective).
+
+        The adjective is None unless the theme is drawn first; pass all three
+        to ``build`` to name it. Raises RuntimeError like ``generate_one``.
+        """
+        if self._theme_table is None:
+            chosen, finals = self._sample(rng, stats, stop)
+            return chosen, finals, None
+        while True:
+            # One read of the table: another thread may replace it meanwhile.
+            adjectives, cum_weights = self._theme_table
+            if not adjectives:
+                raise RuntimeError("No theme can be used with these settings.")
+            adjective = rng.choices(adjectives, cum_weights=cum_weights, k=1)[0]
+            generator = self._theme_generator(adjective)
+            if generator._pairs:
+                # A RuntimeError here means the attempts ran out, not that the
+                # theme can never fit, so it is raised like any other failure.
+                chosen, finals = generator._sample(rng, stats, stop)
+                return chosen, finals, adjective
+
+    def _sample(
+        self,
+        rng: random.Random,
+        stats: Optional[GenerationStats],
+        stop: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[List[int], List[int]]:
+        # Subclass ids and final levels of one accepted build, before naming.
+        stage = no_stage if stats is None else stats.stage
+        self.check_feasible()
+
+        for _ in range(self.max_global_attempts):
+            if stop is not None and stop():
+                raise GenerationStopped("Generation stopped before a build was found.")
+            pair = rng.choices(self._pairs, cum_weights=self._pair_cum_weights, k=1)[0]
+            table = self._composition_tables[pair]
+            kept_share = self._kept_shares.get(pair)
+            if stats is not None:
+                stats.pair_draws += 1
+            for __ in range(ATTEMPTS_PER_PAIR):
+                if stats is not None:
+                    stats.attempts += 1
+                if kept_share is not None and rng.random() >= kept_share:
+                    # The attempt drew a parent set that can never fit; see
+                    # analysis.pair_tables.
+                    if stats is not None:
+                        stats.reject("parent_set")
+                    continue
+                with stage("subclasses"):
+                    chosen = self._choose_subclasses(table, rng)
+                if self._level_bounds is not None:
+                    with stage("fill"):
+                        want_ea = self._want_ea(chosen, rng)
+                        finals = self._bounded_finals(chosen, want_ea, rng)
+                    if finals is None:
+                        if stats is not None:
+                            stats.reject("level_cap")
+                        continue
+                else:
+                    with stage("breakpoints"):
+                        levels = self._find_levels(chosen, rng)
+                    if not levels:
+                        if stats is not None:
+                            stats.reject("level_cap")
+                        continue
+                    with stage("fill"):
+                        want_ea = self._want_ea(chosen, rng)
+                        finals = self.fill_to_cap(chosen, levels, want_ea, rng)
+                if want_ea and not has_extra_attack(finals, map(self._ea_thresholds.__getitem__, chosen)):
+                    if stats is not None:
+                        stats.reject("extra_attack")
+                    continue
+                if self._constraint_index is not None and not self._constraint_index.accepts(
+                    chosen, self._has_martial_access(chosen, finals)
+                ):
+                    if stats is not None:
+                        stats.reject("constraints")
+                    continue
+
+                return chosen, finals
+
+            if stats is not None:
+                stats.reject("pair_exhausted")
+
+        raise RuntimeError("No valid combination found.")
+
+    def build_key(self, chosen: List[int], finals: List[int]) -> BuildKey:
+        names = self.catalog.subclass_names
+        return tuple(sorted((names[subclass_id], level) for subclass_id, level in zip(chosen, finals)))
+
+    def generate(
+        self,
+        n: int,
+        rng: Optional[random.Random] = None,
+        stats: Optional[GenerationStats] = None,
+        unique: bool = False,
+        issued: Optional[Set[BuildKey]] = None,
+    ) -> List[Tuple[str, str]]:
+        """Generate ``n`` builds as ``(name, line)`` pairs.
+
+        With ``unique=True`` no two builds have the same subclasses and levels,
+        and none is in ``issued``; see ``unique.generate_unique``.
+        """
+        if unique or issued is not None:
+            return [(build.name, build.line) for build in self.generate_builds(n, rng, stats, unique, issued)]
+        return [self.generate_one(rng, stats) for _ in range(n)]
+
+    def generate_builds(
+        self,
+        n: int,
+        rng: Optional[random.Random] = None,
+        stats: Optional[GenerationStats] = None,
+        unique: bool = False,
+        issued: Optional[Set[BuildKey]] = None,
+    ) -> List[Build]:
+        """Like ``generate``, but return ``Build`` records."""
+        if unique or issued is not None:
+            from .unique import generate_unique
+
+            return generate_unique(self, n, rng, issued, stats)
+        return [self.generate_build(rng, stats) for _ in range(n)]
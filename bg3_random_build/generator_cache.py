@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .catalog import Catalog
+from .generator import BuildGenerator
+from .live_catalog import LiveCatalog
+
+
+# Warm generators kept per cache, keyed by allowed subclasses and settings.
+GENERATOR_CACHE_SIZE = 32
+
+
+class GeneratorCache:
+    """The compiled catalog of two CSVs plus warm generators, for long-lived processes.
+
+    The catalog is a ``LiveCatalog`` that checks the modification time and
+    size of both CSVs every ``poll_interval`` seconds (by default on every
+    call) and swaps in a reloaded catalog when they changed. Generators are
+    kept per allowed-subclass set and settings, evicting the least recently
+    used beyond ``max_generators``. After a reload, each is moved to the new
+    catalog with ``BuildGenerator.with_catalog`` when next requested, which
+    keeps the tables the edit did not affect; generators handed out earlier
+    keep their old snapshot. Safe to share between threads.
+
+    Pass ``catalog`` instead of the paths to keep generators warm for a fixed
+    catalog that is never reloaded, such as one mapped with
+    ``shared_catalog.map_catalog_file``.
+    """
+
+    def __init__(
+        self,
+        breakpoints_path: Optional[str] = None,
+        themes_path: Optional[str] = None,
+        max_generators: int = GENERATOR_CACHE_SIZE,
+        poll_interval: float = 0.0,
+        catalog: Optional[Catalog] = None,
+    ):
+        if catalog is None and (breakpoints_path is None or themes_path is None):
+            raise ValueError("GeneratorCache needs both CSV paths or a catalog")
+        self.paths = (breakpoints_path, themes_path)
+        self.max_generators = max_generators
+        self.poll_interval = poll_interval
+        self.fixed_catalog = catalog
+        self._lock = threading.Lock()
+        self._live: Optional[LiveCatalog] = None
+        self._catalog: Optional[Catalog] = None
+        self._names_by_parent: Dict[str, List[str]] = {}
+        # key -> (catalog the generator was built for, generator)
+        self._generators: "OrderedDict[tuple, Tuple[Catalog, BuildGenerator]]" = OrderedDict()
+
+    def _refresh(self) -> Catalog:
+        # Call with the lock held.
+        if self.fixed_catalog is not None:
+            catalog = self.fixed_catalog
+        else:
+            if self._live is None:
+                self._live = LiveCatalog(*self.paths, poll_interval=self.poll_interval)
+            catalog = self._live.snapshot()
+        if catalog is not self._catalog:
+            self._catalog = catalog
+            self._names_by_parent = {
+                parent: [catalog.subclass_names[i] for i in subclass_ids]
+                for parent, subclass_ids in zip(catalog.parent_names, catalog.subclasses_by_parent)
+            }
+        return catalog
+
+    def catalog(self) -> Catalog:
+        """Return the current catalog, reloading it if a CSV changed."""
+        with self._lock:
+            return self._refresh()
+
+    def subclasses_by_parent(self) -> Dict[str, List[str]]:
+        """Subclass names of each parent class, in catalog order. Do not modify."""
+        with self._lock:
+            self._refresh()
+            return self._names_by_parent
+
+    def generator(self, subclasses: Optional[Iterable[str]] = None, **settings) -> BuildGenerator:
+        """Return a warm generator for these subclasses (None for all) and settings.
+
+        ``settings`` are ``BuildGenerator`` keyword arguments and must be
+        JSON-serializable. Callers sharing a generator should pass their own
+        ``rng`` to its generate methods.
+        """
+        subclass_set = None if subclasses is None else frozenset(subclasses)
+        key = (subclass_set, json.dumps(settings, sort_keys=True))
+        with self._lock:
+            catalog = self._refresh()
+            entry = self._generators.get(key)
+            if entry is not None:
+                self._generators.move_to_end(key)
+                if entry[0] is catalog:
+                    return entry[1]
+        # Build outside the lock; a concurrent miss for the same key just builds twice.
+        target = catalog if subclass_set is None else catalog.subset(subclass_set)
+        if entry is None:
+            generator = BuildGenerator(target, **settings)
+        else:
+            generator = entry[1].with_catalog(target)
+        with self._lock:
+            if self._catalog is catalog:
+                self._generators[key] = (catalog, generator)
+                self._generators.move_to_end(key)
+                while len(self._generators) > self.max_generators:
+                    self._generators.popitem(last=False)
+        return generator
+
+    def clear(self) -> None:
+        """Forget all generators and, unless it is fixed, the catalog."""
+        with self._lock:
+            self._live = self._catalog = None
+            self._names_by_parent = {}
+            self._generators.clear()
+
+
+_shared_caches: Dict[Tuple[str, str], GeneratorCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_cache(breakpoints_path: str, themes_path: str) -> GeneratorCache:
+    """Return the process-wide cache for these CSVs, creating it on first use.
+
+    The cache lives in this module, so it outlives Streamlit script reruns and
+    is shared by all sessions of a server. It only ever holds objects built by
+    the running package, unlike pickled caches that can outlive an upgrade.
+    """
+    key = (os.path.abspath(breakpoints_path), os.path.abspath(themes_path))
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = _shared_caches[key] = GeneratorCache(*key)
+        return cache
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+from .catalog import Catalog, load_catalog, save_cached_catalog
+from .data_io import load_themes, read_breakpoint_rows
+
+
+# Seconds between checks of the CSVs' modification times.
+RELOAD_INTERVAL = 1.0
+
+# (mtime_ns, size) of the breakpoints and themes CSVs
+_SourceKey = Tuple[Tuple[int, int], ...]
+
+
+def _source_key(paths: Tuple[str, ...]) -> _SourceKey:
+    stats = [os.stat(path) for path in paths]
+    return tuple((st.st_mtime_ns, st.st_size) for st in stats)
+
+
+def _file_digest(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+class LiveCatalog:
+    """A catalog that follows edits to its two CSVs, for long-running processes.
+
+    ``snapshot()`` returns the current ``Catalog``. At most every
+    ``poll_interval`` seconds (0 checks on every call) it first compares the
+    modification time and size of both CSVs with the last load. When either
+    changed and the content really differs, the files are re-read and a new
+    catalog is swapped in under a lock. Catalogs are never modified once
+    built, so whoever holds a snapshot, e.g. a generator in the middle of a
+    run, keeps a consistent view while later callers get the update.
+
+    Only what changed is recompiled: a breakpoints-only edit keeps the theme
+    index and its cached lookups (``Catalog.with_rows``), and
+    ``BuildGenerator.with_catalog`` carries a generator's tables over to the
+    new snapshot as far as they are still valid. A file that fails to parse,
+    e.g. one caught half-written, leaves the last good catalog in place and is
+    kept in ``last_error`` until the next successful load.
+    """
+
+    def __init__(
+        self,
+        breakpoints_path: str,
+        themes_path: str,
+        poll_interval: float = RELOAD_INTERVAL,
+        use_cache: bool = True,
+    ):
+        self.paths = (breakpoints_path, themes_path)
+        self.poll_interval = poll_interval
+        self.use_cache = use_cache
+        # Bumped on every swap, so callers can tell snapshots apart cheaply.
+        self.version = 0
+        self.last_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._source = _source_key(self.paths)
+        self._digests = tuple(_file_digest(path) for path in self.paths)
+        self._catalog = load_catalog(breakpoints_path, themes_path, use_cache)
+        self._checked = time.monotonic()
+
+    def snapshot(self) -> Catalog:
+        """Return the current catalog, reloading first when a poll is due."""
+        if time.monotonic() - self._checked >= self.poll_interval:
+            self.poll()
+        return self._catalog
+
+    def poll(self) -> bool:
+        """Check both CSVs now and reload them if they changed; return whether the catalog did."""
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                source = _source_key(self.paths)
+                if source == self._source:
+                    return False
+                digests = tuple(_file_digest(path) for path in self.paths)
+                catalog = self._load(digests)
+                if _source_key(self.paths) != source:
+                    # A file changed while it was read; take it on the next poll.
+                    return False
+            except Exception as e:  # any failure keeps the last good catalog
+                self.last_error = e
+                if not isinstance(e, OSError):
+                    try:
+                        if _source_key(self.paths) == source:
+                            # Don't re-parse a broken file until it changes again.
+                            self._source = source
+                    except OSError:
+                        pass
+                return False
+            self._source, self._digests = source, digests
+            self.last_error = None
+            if catalog is self._catalog:
+                return False
+            self._catalog = catalog
+            self.version += 1
+            return True
+
+    def _load(self, digests: Tuple[bytes, ...]) -> Catalog:
+        # Call with the lock held.
+        if digests == self._digests:
+            return self._catalog  # touched or rewritten with the same content
+        breakpoints_path, themes_path = self.paths
+        rows = read_breakpoint_rows(breakpoints_path)
+        if digests[1] == self._digests[1]:
+            catalog = self._catalog.with_rows(rows)
+        else:
+            themes, theme_requirements = load_themes(themes_path)
+            catalog = Catalog(rows, themes, theme_requirements)
+        if self.use_cache:
+            save_cached_catalog(breakpoints_path, themes_path, catalog)
+        return catalog
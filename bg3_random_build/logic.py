@@ -1,5 +1,7 @@
+import itertools
 import random
-from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from math import comb
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
 
 from .config import (
     CASTER_PARENTS,
@@ -12,7 +14,13 @@ from .config import (
     SECONDARY_SUFFIX_BY_COMP,
 )
 from .data_io import ThemeRequirements
-from .models import SubBreakpoint
+from .models import SubBreakpoint, join_name
+
+if TYPE_CHECKING:
+    from .constraints import BuildConstraints
+
+
+ParentSetTable = Tuple[List[Tuple[str, ...]], List[int]]
 
 
 COMPOSITION_WEIGHT_DEFAULTS = getattr(
@@ -22,14 +30,21 @@ COMPOSITION_WEIGHT_DEFAULTS = getattr(
 ) or {"martial": 0.25, "caster": 0.35, "hybrid": 0.40}
 
 
-def weighted_choice(weight_map: Dict[int, float]) -> int:
+def _resolve_rng(rng: Optional[random.Random]):
+    """Return ``rng``, or the shared ``random`` module state when it is None."""
+    return random if rng is None else rng
+
+
+def weighted_choice(weight_map: Dict[int, float], rng: Optional[random.Random] = None) -> int:
+    rng = _resolve_rng(rng)
     vals, wts = zip(*weight_map.items())
-    return random.choices(vals, weights=wts, k=1)[0]
+    return rng.choices(vals, weights=wts, k=1)[0]
 
 
-def weighted_choice_str(weight_map: Dict[str, float]) -> str:
+def weighted_choice_str(weight_map: Dict[str, float], rng: Optional[random.Random] = None) -> str:
+    rng = _resolve_rng(rng)
     vals, wts = zip(*weight_map.items())
-    return random.choices(vals, weights=wts, k=1)[0]
+    return rng.choices(vals, weights=wts, k=1)[0]
 
 
 def index_structures(sub_bps: List[SubBreakpoint]):
@@ -42,41 +57,92 @@ def index_structures(sub_bps: List[SubBreakpoint]):
     return options_by_subclass, subclasses_by_parent
 
 
-def choose_k_parents(k: int, parents: List[str]) -> List[str]:
+def choose_k_parents(k: int, parents: List[str], rng: Optional[random.Random] = None) -> List[str]:
+    rng = _resolve_rng(rng)
     if k > len(parents):
         return []
-    return random.sample(parents, k)
+    return rng.sample(parents, k)
 
 
-def choose_parents_for_composition(k: int, available_parents: List[str], comp_target: str) -> List[str]:
+def choose_parents_for_composition(
+    k: int,
+    available_parents: List[str],
+    comp_target: str,
+    rng: Optional[random.Random] = None,
+) -> List[str]:
     """Choose parent classes for the requested broad composition.
 
     martial: only martial parents
     caster: only caster parents
     hybrid: at least one martial and one caster parent
     """
+    rng = _resolve_rng(rng)
     martial = [p for p in available_parents if p in MARTIAL_PARENTS]
     caster = [p for p in available_parents if p in CASTER_PARENTS]
 
     if comp_target == "martial":
-        return choose_k_parents(k, martial)
+        return choose_k_parents(k, martial, rng)
 
     if comp_target == "caster":
-        return choose_k_parents(k, caster)
+        return choose_k_parents(k, caster, rng)
 
     if comp_target == "hybrid":
         if k < 2 or not martial or not caster:
             return []
-        parents = [random.choice(martial), random.choice(caster)]
+        parents = [rng.choice(martial), rng.choice(caster)]
         remaining_pool = [p for p in available_parents if p not in parents]
-        extra = choose_k_parents(k - 2, remaining_pool)
+        extra = choose_k_parents(k - 2, remaining_pool, rng)
         if len(extra) != k - 2:
             return []
         parents.extend(extra)
-        random.shuffle(parents)
+        rng.shuffle(parents)
         return parents
 
-    return choose_k_parents(k, available_parents)
+    return choose_k_parents(k, available_parents, rng)
+
+
+def _fits_composition(parents: Tuple[str, ...], comp_target: str) -> bool:
+    if comp_target == "martial":
+        return all(parent in MARTIAL_PARENTS for parent in parents)
+    if comp_target == "caster":
+        return all(parent in CASTER_PARENTS for parent in parents)
+    if comp_target == "hybrid":
+        return (
+            len(parents) >= 2
+            and any(parent in MARTIAL_PARENTS for parent in parents)
+            and any(parent in CASTER_PARENTS for parent in parents)
+        )
+    return True
+
+
+def composition_parent_sets(
+    k: int,
+    subclasses_by_parent: Dict[str, List[str]],
+    comp_target: str,
+) -> ParentSetTable:
+    """Enumerate the parent sets that can form a k-subclass build of a composition.
+
+    Each parent set is weighted by how many subclass combinations it allows (one
+    subclass per parent), and the weights are returned as running totals for
+    ``random.choices(..., cum_weights=...)``. The last total is the number of
+    valid subclass combinations, so an empty table means none exist.
+    """
+    parent_sets: List[Tuple[str, ...]] = []
+    cum_weights: List[int] = []
+    total = 0
+    if k < 1:
+        return parent_sets, cum_weights
+    for parents in itertools.combinations(subclasses_by_parent, k):
+        if not _fits_composition(parents, comp_target):
+            continue
+        weight = 1
+        for parent in parents:
+            weight *= len(subclasses_by_parent[parent])
+        if weight:
+            total += weight
+            parent_sets.append(parents)
+            cum_weights.append(total)
+    return parent_sets, cum_weights
 
 
 def choose_subclasses_for_composition(
@@ -84,34 +150,76 @@ def choose_subclasses_for_composition(
     options_by_subclass: Dict[str, List[SubBreakpoint]],
     comp_target: str,
     max_tries: int = 2000,
+    rng: Optional[random.Random] = None,
 ) -> List[str]:
     """Choose subclasses directly so breakpoint count cannot affect selection weight.
 
-    A valid build may use at most one subclass from each parent class. Composition
-    constraints are checked after sampling, keeping subclasses within each eligible
-    composition equally likely rather than choosing parent classes first.
+    A valid build may use at most one subclass from each parent class. Every
+    combination that satisfies the composition is counted per parent set and
+    one is drawn from that exact total, keeping subclasses within each eligible
+    composition equally likely. An impossible request returns an empty list
+    straight away. ``max_tries`` is kept for callers of the old sampler.
     """
-    subclasses = list(options_by_subclass)
-    if k > len(subclasses):
+    rng = _resolve_rng(rng)
+    subclasses_by_parent: Dict[str, List[str]] = {}
+    for subclass, options in options_by_subclass.items():
+        subclasses_by_parent.setdefault(options[0].parent_class, []).append(subclass)
+    parent_sets, cum_weights = composition_parent_sets(k, subclasses_by_parent, comp_target)
+    if not parent_sets:
         return []
+    parents = rng.choices(parent_sets, cum_weights=cum_weights, k=1)[0]
+    chosen = [rng.choice(subclasses_by_parent[parent]) for parent in parents]
+    # Keep the order random, as random.sample used to; ties in later steps
+    # (Extra Attack top-up, dominant parent) are broken by pick order.
+    rng.shuffle(chosen)
+    return chosen
 
-    for _ in range(max_tries):
-        chosen = random.sample(subclasses, k)
-        parents = [options_by_subclass[subclass][0].parent_class for subclass in chosen]
-        if len(set(parents)) != k:
-            continue
 
-        has_martial = any(parent in MARTIAL_PARENTS for parent in parents)
-        has_caster = any(parent in CASTER_PARENTS for parent in parents)
-        if comp_target == "martial" and not all(parent in MARTIAL_PARENTS for parent in parents):
-            continue
-        if comp_target == "caster" and not all(parent in CASTER_PARENTS for parent in parents):
-            continue
-        if comp_target == "hybrid" and (k < 2 or not has_martial or not has_caster):
-            continue
-        return chosen
+def level_combo_table(cap: int, level_options: Sequence[Sequence[int]]) -> List[List[int]]:
+    """Count the breakpoint assignments that fit under a level cap.
 
-    return []
+    ``table[i][t]`` is the number of ways to pick one level from each of
+    ``level_options[i:]`` with a total of at most ``t``, so ``table[0][cap]``
+    is the number of feasible assignments for the whole build.
+    """
+    size = max(cap, -1) + 1
+    table = [[0] * size for _ in range(len(level_options))]
+    table.append([1] * size)
+    for i in range(len(level_options) - 1, -1, -1):
+        row, following = table[i], table[i + 1]
+        for total in range(size):
+            row[total] = sum(
+                following[total - level] for level in level_options[i] if level <= total
+            )
+    return table
+
+
+def sample_level_combo(
+    table: List[List[int]],
+    cap: int,
+    level_options: Sequence[Sequence[int]],
+    rng: Optional[random.Random] = None,
+) -> Optional[List[int]]:
+    """Draw one assignment uniformly from those counted by ``level_combo_table``.
+
+    Returns ``None`` when no assignment fits under the cap.
+    """
+    rng = _resolve_rng(rng)
+    if not level_options or cap < 0 or not table[0][cap]:
+        return None
+    levels: List[int] = []
+    budget = cap
+    for i, options in enumerate(level_options):
+        following = table[i + 1]
+        fitting = [level for level in options if level <= budget]
+        level = rng.choices(
+            fitting,
+            weights=[following[budget - level] for level in fitting],
+            k=1,
+        )[0]
+        levels.append(level)
+        budget -= level
+    return levels
 
 
 def try_find_combo_for_subclasses(
@@ -119,48 +227,47 @@ def try_find_combo_for_subclasses(
     chosen_subclasses: List[str],
     options_by_subclass: Dict[str, List[SubBreakpoint]],
     max_random_tries: int = 8000,
+    rng: Optional[random.Random] = None,
 ) -> Optional[List[SubBreakpoint]]:
+    """Pick one breakpoint per subclass so the levels fit under ``cap``.
+
+    Every fitting assignment is equally likely, and ``None`` means that no
+    assignment fits at all. ``max_random_tries`` is kept for callers of the old
+    random-retry search.
+    """
     if not chosen_subclasses:
         return None
-    min_sum = sum(min(bp.levels for bp in options_by_subclass[s]) for s in chosen_subclasses)
-    if min_sum > cap:
+    level_options = [
+        [bp.levels for bp in options_by_subclass[subclass]]
+        for subclass in chosen_subclasses
+    ]
+    levels = sample_level_combo(level_combo_table(cap, level_options), cap, level_options, rng)
+    if levels is None:
         return None
-    for _ in range(max_random_tries):
-        pick: List[SubBreakpoint] = []
-        total = 0
-        feasible = True
-        for sc in chosen_subclasses:
-            bp = random.choice(options_by_subclass[sc])
-            pick.append(bp)
-            total += bp.levels
-            if total > cap:
-                feasible = False
-                break
-        if feasible:
-            return pick
-    return None
+    picks = []
+    for subclass, level in zip(chosen_subclasses, levels):
+        picks.append(next(bp for bp in options_by_subclass[subclass] if bp.levels == level))
+    return picks
 
 
-def _ea_threshold_for(bp: SubBreakpoint) -> Optional[int]:
-    if bp.parent_class in EA_PARENT_THRESHOLDS:
-        return EA_PARENT_THRESHOLDS[bp.parent_class]
-    return EA_SUBCLASS_THRESHOLDS.get((bp.parent_class, bp.subclass))
+def ea_threshold(parent_class: str, subclass: str) -> Optional[int]:
+    """Return the level at which a subclass gains Extra Attack, if it ever does."""
+    if parent_class in EA_PARENT_THRESHOLDS:
+        return EA_PARENT_THRESHOLDS[parent_class]
+    return EA_SUBCLASS_THRESHOLDS.get((parent_class, subclass))
 
 
-def _has_extra_attack(finals: Dict[Tuple[str, str], int], picks: List[SubBreakpoint]) -> bool:
-    for bp in picks:
-        key = (bp.subclass, bp.parent_class)
-        th = _ea_threshold_for(bp)
-        if th is not None and finals.get(key, 0) >= th:
-            return True
-    return False
+def _ea_threshold_for(bp: SubBreakpoint) -> Optional[int]:
+    return ea_threshold(bp.parent_class, bp.subclass)
 
 
 def fill_to_cap_with_preferences(
     picks: List[SubBreakpoint],
     cap: int,
     want_ea: bool,
+    rng: Optional[random.Random] = None,
 ) -> Dict[Tuple[str, str], int]:
+    rng = _resolve_rng(rng)
     finals: Dict[Tuple[str, str], int] = {}
     for bp in picks:
         finals[(bp.subclass, bp.parent_class)] = finals.get((bp.subclass, bp.parent_class), 0) + bp.levels
@@ -194,7 +301,7 @@ def fill_to_cap_with_preferences(
 
     if remaining > 0:
         odd_keys = [k for k in keys if finals[k] % 2 == 1]
-        random.shuffle(odd_keys)
+        rng.shuffle(odd_keys)
         for k in odd_keys:
             if remaining == 0:
                 break
@@ -202,7 +309,7 @@ def fill_to_cap_with_preferences(
             remaining -= 1
 
     while remaining >= 2:
-        random.shuffle(keys)
+        rng.shuffle(keys)
         for k in keys:
             if remaining < 2:
                 break
@@ -213,11 +320,88 @@ def fill_to_cap_with_preferences(
         candidates = [k for k in keys if finals[k] % 2 == 1]
         if not candidates:
             candidates = keys[:]
-        finals[random.choice(candidates)] += 1
+        finals[rng.choice(candidates)] += 1
 
     return finals
 
 
+def _subsets(positions: Sequence[int], size: int) -> Tuple[List[Tuple[int, ...]], float]:
+    # The uniformly random subset picked by "shuffle, then take the first size".
+    return list(itertools.combinations(positions, size)), 1.0 / comb(len(positions), size)
+
+
+def fill_outcomes(
+    levels: Tuple[int, ...],
+    thresholds: Tuple[int, ...],
+    want_ea: bool,
+    level_cap: int,
+    ties_by_position: bool = False,
+) -> List[Tuple[Tuple[int, ...], float]]:
+    """Every result of ``fill_to_cap_with_preferences`` with its probability.
+
+    Mirrors the fill step by step: the Extra Attack top-up, the random odd
+    levels topped up to even, the shuffled rounds of +2 and the final +1.
+    ``levels`` and ``thresholds`` (Extra Attack level, or 0 for none) are per
+    pick. The fill tops up the first of
+    equally close Extra Attack candidates in pick order; with
+    ``ties_by_position`` that is the first position, otherwise each of them
+    is equally likely, which is the result over a random pick order.
+    """
+    finals = list(levels)
+    remaining = level_cap - sum(finals)
+    if remaining <= 0:
+        return [(tuple(finals), 1.0)]
+
+    branches = [(finals, remaining, 1.0)]
+    if want_ea and not any(th and level >= th for level, th in zip(finals, thresholds)):
+        needs = [(th - level, i) for i, (level, th) in enumerate(zip(finals, thresholds)) if th]
+        if needs:
+            best = min(need for need, _ in needs)
+            tied = [i for need, i in needs if need == best]
+            if ties_by_position:
+                tied = tied[:1]
+            alloc = min(best, remaining)
+            branches = []
+            for i in tied:
+                topped = list(finals)
+                topped[i] += alloc
+                branches.append((topped, remaining - alloc, 1.0 / len(tied)))
+
+    positions = range(len(finals))
+    out: Dict[Tuple[int, ...], float] = {}
+    for finals, remaining, probability in branches:
+        if remaining > 0:
+            odd = [i for i in positions if finals[i] % 2 == 1]
+            picks, share = _subsets(odd, min(remaining, len(odd)))
+            branches_odd = []
+            for picked in picks:
+                bumped = list(finals)
+                for i in picked:
+                    bumped[i] += 1
+                branches_odd.append((bumped, remaining - len(picked), probability * share))
+        else:
+            branches_odd = [(finals, remaining, probability)]
+
+        for finals, remaining, probability in branches_odd:
+            rounds, extra = divmod(remaining // 2, len(finals))
+            picks, share = _subsets(positions, extra)
+            for picked in picks:
+                bumped = [level + 2 * rounds for level in finals]
+                for i in picked:
+                    bumped[i] += 2
+                if remaining % 2:
+                    candidates = [i for i in positions if bumped[i] % 2 == 1] or list(positions)
+                    for i in candidates:
+                        last = list(bumped)
+                        last[i] += 1
+                        key = tuple(last)
+                        out[key] = out.get(key, 0.0) + probability * share / len(candidates)
+                else:
+                    key = tuple(bumped)
+                    out[key] = out.get(key, 0.0) + probability * share
+    return list(out.items())
+
+
 def _parents_in_build(final_levels: Dict[Tuple[str, str], int]) -> Set[str]:
     parents = set()
     for (_, parent), lvl in final_levels.items():
@@ -233,16 +417,7 @@ def _build_capabilities(picks: List[SubBreakpoint]) -> Set[str]:
     return capabilities
 
 
-def adjective_fits(
-    adjective: str,
-    build_capabilities: Set[str],
-    theme_requirements: ThemeRequirements,
-    has_martial_access: bool = True,
-) -> bool:
-    alternatives = theme_requirements.get(adjective)
-    if not alternatives:
-        return True
-
+def _normalize_alternatives(alternatives) -> List[FrozenSet[str]]:
     # Current loaders return a list of frozensets. This small compatibility
     # guard also handles legacy in-memory values from the old web app schema.
     normalized = []
@@ -254,10 +429,43 @@ def adjective_fits(
                 part.strip() for part in required.split("+") if part.strip()
             )
         normalized.append(required)
+    return normalized
+
+
+def normalize_theme_requirements(theme_requirements: ThemeRequirements) -> ThemeRequirements:
+    """Return theme requirements as lists of frozensets, dropping empty entries."""
+    normalized: ThemeRequirements = {}
+    for adjective, alternatives in theme_requirements.items():
+        if alternatives:
+            normalized[adjective] = _normalize_alternatives(alternatives)
+    return normalized
+
+
+def _alternatives_fit(
+    alternatives: List[FrozenSet[str]],
+    build_capabilities: Set[str],
+    has_martial_access: bool,
+) -> bool:
     return any(
         required.issubset(build_capabilities)
         and ("martial" not in required or has_martial_access)
-        for required in normalized
+        for required in alternatives
+    )
+
+
+def adjective_fits(
+    adjective: str,
+    build_capabilities: Set[str],
+    theme_requirements: ThemeRequirements,
+    has_martial_access: bool = True,
+) -> bool:
+    alternatives = theme_requirements.get(adjective)
+    if not alternatives:
+        return True
+    return _alternatives_fit(
+        _normalize_alternatives(alternatives),
+        build_capabilities,
+        has_martial_access,
     )
 
 
@@ -271,11 +479,14 @@ def _has_martial_theme_access(
     actually reached its Extra Attack threshold. Merely carrying the martial
     capability tag is not enough.
     """
-    has_rogue = any(
-        parent == "Rogue" and level >= 4
-        for (_, parent), level in final_levels.items()
+    # Imported here: analysis builds on this module. It holds the rule.
+    from .analysis import has_martial_access, martial_access_level
+
+    thresholds = {(bp.subclass, bp.parent_class): _ea_threshold_for(bp) or 0 for bp in picks}
+    return has_martial_access(
+        final_levels.values(),
+        [martial_access_level(parent, thresholds.get((subclass, parent), 0)) for subclass, parent in final_levels],
     )
-    return has_rogue or _has_extra_attack(final_levels, picks)
 
 
 def pick_adjective_for(
@@ -283,7 +494,9 @@ def pick_adjective_for(
     final_levels: Dict[Tuple[str, str], int],
     themes: Dict[str, str],
     theme_requirements: ThemeRequirements,
+    rng: Optional[random.Random] = None,
 ) -> str:
+    rng = _resolve_rng(rng)
     build_capabilities = _build_capabilities(picks)
     has_martial_access = _has_martial_theme_access(final_levels, picks)
     fitting = [
@@ -301,7 +514,8 @@ def pick_adjective_for(
             "No theme matches the selected subclasses' capabilities. "
             "Add an unrestricted theme or review the capability tags."
         )
-    return random.choice(fitting)
+    return rng.choice(fitting)
+
 
 def _levels_by_parent(final_levels: Dict[Tuple[str, str], int]) -> Dict[str, int]:
     by_parent: Dict[str, int] = {}
@@ -323,26 +537,20 @@ def _top_name_parents(final_levels: Dict[Tuple[str, str], int], limit: int = 2)
 
 
 def _composition_role(final_levels: Dict[Tuple[str, str], int]) -> str:
-    m = c = 0
-    by_parent = _levels_by_parent(final_levels)
-    for parent, total in by_parent.items():
-        if parent in MARTIAL_PARENTS:
-            m += total
-        if parent in CASTER_PARENTS:
-            c += total
-    if m > 0 and c > 0:
-        return "hybrid"
-    return "martial" if m >= c else "caster"
+    from .analysis import parent_role
 
+    return parent_role(parent for (_, parent), level in final_levels.items() if level > 0)
 
-def _pick_role_suffix(dominant_parent: str, comp: str) -> str:
+
+def _pick_role_suffix(dominant_parent: str, comp: str, rng: Optional[random.Random] = None) -> str:
+    rng = _resolve_rng(rng)
     if dominant_parent in ROLE_SUFFIX_BY_PARENT:
-        return random.choice(ROLE_SUFFIX_BY_PARENT[dominant_parent])
+        return rng.choice(ROLE_SUFFIX_BY_PARENT[dominant_parent])
     if comp == "hybrid":
-        return random.choice(SECONDARY_SUFFIX_BY_COMP["hybrid"])
+        return rng.choice(SECONDARY_SUFFIX_BY_COMP["hybrid"])
     if comp == "martial":
-        return random.choice(["Fighter", "Vanguard", "Skirmisher"])
-    return random.choice(["Caster", "Invoker", "Arcanist"])
+        return rng.choice(["Fighter", "Vanguard", "Skirmisher"])
+    return rng.choice(["Caster", "Invoker", "Arcanist"])
 
 
 def build_name_and_blurb(
@@ -352,17 +560,30 @@ def build_name_and_blurb(
     theme_requirements: ThemeRequirements,
     name_max_hooks: int,
     use_adjective: bool,
+    rng: Optional[random.Random] = None,
 ) -> Tuple[str, str]:
+    rng = _resolve_rng(rng)
+    adjective = pick_adjective_for(picks, final_levels, themes, theme_requirements, rng)
+    blurb = themes.get(adjective, "themed build")
+    hooks, roles = pick_name_words(final_levels, name_max_hooks, rng)
+    return join_name(adjective, hooks, roles, use_adjective), blurb
+
+
+def pick_name_words(
+    final_levels: Dict[Tuple[str, str], int],
+    name_max_hooks: int,
+    rng: Optional[random.Random] = None,
+) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Draw the flavor hooks and role suffixes of a build name."""
+    rng = _resolve_rng(rng)
     comp = _composition_role(final_levels)
     dom = _dominant_parent(final_levels)
-    adjective = pick_adjective_for(picks, final_levels, themes, theme_requirements)
-    blurb = themes.get(adjective, "themed build")
-    role1 = _pick_role_suffix(dom, comp)
+    role1 = _pick_role_suffix(dom, comp, rng)
     role2 = None
-    if comp in SECONDARY_SUFFIX_BY_COMP and random.random() < 0.45:
-        role2 = random.choice(SECONDARY_SUFFIX_BY_COMP[comp])
+    if comp in SECONDARY_SUFFIX_BY_COMP and rng.random() < 0.45:
+        role2 = rng.choice(SECONDARY_SUFFIX_BY_COMP[comp])
         if role2 == role1 and len(SECONDARY_SUFFIX_BY_COMP[comp]) > 1:
-            role2 = random.choice([r for r in SECONDARY_SUFFIX_BY_COMP[comp] if r != role1])
+            role2 = rng.choice([r for r in SECONDARY_SUFFIX_BY_COMP[comp] if r != role1])
 
     hooks = []
     if name_max_hooks > 0:
@@ -370,18 +591,12 @@ def build_name_and_blurb(
         # level investment are allowed to contribute flavor hooks to the name.
         for parent in _top_name_parents(final_levels, limit=2):
             if parent in FLAVOR_MAP and FLAVOR_MAP[parent]:
-                hooks.append(random.choice(FLAVOR_MAP[parent]))
-        random.shuffle(hooks)
+                hooks.append(rng.choice(FLAVOR_MAP[parent]))
+        rng.shuffle(hooks)
         hooks = hooks[:name_max_hooks]
 
-    parts = []
-    if use_adjective:
-        parts.append(adjective)
-    parts += hooks
-    parts.append(role1)
-    if role2:
-        parts.append(role2)
-    return " ".join(parts), blurb
+    roles = (role1, role2) if role2 else (role1,)
+    return tuple(hooks), roles
 
 
 def format_build(
@@ -413,60 +628,31 @@ def suggest_build(
     name_max_hooks: int = DEFAULTS.name_max_hooks,
     use_adjective: bool = DEFAULTS.use_adjective,
     include_blurb: bool = True,
+    rng: Optional[random.Random] = None,
+    constraints: Optional["BuildConstraints"] = None,
 ) -> Tuple[str, str]:
-    if num_subclass_weights is None:
-        num_subclass_weights = DEFAULTS.num_subclasses_weights
-    if composition_weights is None:
-        composition_weights = COMPOSITION_WEIGHT_DEFAULTS
-
-    options_by_subclass, subclasses_by_parent = index_structures(sub_bps)
-    available_parents = list(subclasses_by_parent.keys())
-    if not available_parents:
-        raise RuntimeError("No subclasses available.")
-
-    for _ in range(max_global_attempts):
-        k = weighted_choice(num_subclass_weights)
-        if k > len(available_parents):
-            continue
-
-        comp_target = weighted_choice_str(composition_weights)
-        for __ in range(80):
-            chosen_subclasses = choose_subclasses_for_composition(
-                k, options_by_subclass, comp_target
-            )
-            if not chosen_subclasses:
-                continue
-            picks = try_find_combo_for_subclasses(level_cap, chosen_subclasses, options_by_subclass)
-            if not picks:
-                continue
-
-            prelim = fill_to_cap_with_preferences(picks, level_cap, want_ea=False)
-            comp = _composition_role(prelim)
-            want_ea = (comp == "martial" and require_ea_if_martial) or (
-                comp == "hybrid" and random.random() < prefer_ea_if_hybrid
-            )
-            finals = fill_to_cap_with_preferences(picks, level_cap, want_ea=want_ea)
-            if want_ea and not _has_extra_attack(finals, picks):
-                continue
-
-            name, blurb = build_name_and_blurb(
-                picks,
-                finals,
-                themes,
-                theme_requirements,
-                name_max_hooks,
-                use_adjective,
-            )
-            line = format_build(
-                picks,
-                finals,
-                blurb,
-                show_parent_in_label,
-                include_blurb=include_blurb,
-            )
-            return name, line
-
-    raise RuntimeError("No valid combination found.")
+    """Generate one build; ``constraints`` restricts it as in ``BuildGenerator``."""
+    # Imported here because the generator is built on the helpers in this module.
+    from .generator import BuildGenerator
+
+    generator = BuildGenerator.from_breakpoints(
+        sub_bps,
+        themes,
+        theme_requirements,
+        level_cap=level_cap,
+        num_subclass_weights=num_subclass_weights,
+        composition_weights=composition_weights,
+        max_global_attempts=max_global_attempts,
+        show_parent_in_label=show_parent_in_label,
+        require_ea_if_martial=require_ea_if_martial,
+        prefer_ea_if_hybrid=prefer_ea_if_hybrid,
+        name_max_hooks=name_max_hooks,
+        use_adjective=use_adjective,
+        include_blurb=include_blurb,
+        rng=rng,
+        constraints=constraints,
+    )
+    return generator.generate_one()
 
 
 def suggest_many(
@@ -474,10 +660,16 @@ def suggest_many(
     themes: Dict[str, str],
     theme_requirements: ThemeRequirements,
     n: int = 4,
+    rng: Optional[random.Random] = None,
+    unique: bool = False,
+    issued: Optional[Set[Tuple[Tuple[str, int], ...]]] = None,
     **kwargs,
 ) -> List[Tuple[str, str]]:
-    out = []
-    for _ in range(n):
-        name, line = suggest_build(sub_bps, themes, theme_requirements, **kwargs)
-        out.append((name, line))
-    return out
+    """Generate ``n`` builds; ``unique``/``issued`` work as in ``BuildGenerator.generate``.
+
+    Other keyword arguments, e.g. ``constraints``, go to ``BuildGenerator``.
+    """
+    from .generator import BuildGenerator
+
+    generator = BuildGenerator.from_breakpoints(sub_bps, themes, theme_requirements, rng=rng, **kwargs)
+    return generator.generate(n, unique=unique, issued=issued)
@@ -1,16 +1,120 @@
-from dataclasses import dataclass
-from typing import FrozenSet
+from functools import cached_property
+from typing import TYPE_CHECKING, FrozenSet, NamedTuple, Tuple
 
+if TYPE_CHECKING:
+    from .catalog import Catalog
 
-@dataclass(frozen=True)
-class SubBreakpoint:
+
+def subclass_label(subclass: str, parent_class: str, final_levels: int, show_parent: bool) -> str:
+    if show_parent:
+        return f"{parent_class} ({subclass}) {final_levels}"
+
+    return f"{subclass} {final_levels}"
+
+
+def join_name(adjective: str, hooks: Tuple[str, ...], roles: Tuple[str, ...], use_adjective: bool) -> str:
+    parts = [adjective] if use_adjective else []
+    parts += hooks
+    parts += roles
+    return " ".join(parts)
+
+
+class SubBreakpoint(NamedTuple):
     subclass: str
     levels: int
     parent_class: str
     capabilities: FrozenSet[str] = frozenset()
 
     def label(self, final_levels: int, show_parent: bool) -> str:
-        if show_parent:
-            return f"{self.parent_class} ({self.subclass}) {final_levels}"
+        return subclass_label(self.subclass, self.parent_class, final_levels, show_parent)
+
+
+class Build:
+    """One generated build, as catalog ids plus the random name words.
+
+    ``subclass_ids`` and ``levels`` are in pick order. ``name`` and ``line``
+    are the display strings of ``generate_one``; they are only formatted
+    when first read and then cached, so do not change the fields afterwards.
+    Builds compare equal when everything but the catalog matches.
+    """
+
+    # Plain class instead of a dataclass, which is slow to import; see
+    # config.Defaults.
+    _FIELDS = (
+        "subclass_ids",
+        "levels",
+        "adjective",
+        "hooks",
+        "roles",
+        "show_parent_in_label",
+        "use_adjective",
+        "include_blurb",
+    )
+
+    def __init__(
+        self,
+        catalog: "Catalog",
+        subclass_ids: Tuple[int, ...],
+        levels: Tuple[int, ...],
+        adjective: str,
+        hooks: Tuple[str, ...],
+        roles: Tuple[str, ...],
+        show_parent_in_label: bool = False,
+        use_adjective: bool = True,
+        include_blurb: bool = True,
+    ):
+        self.catalog = catalog
+        self.subclass_ids = subclass_ids
+        self.levels = levels
+        self.adjective = adjective
+        self.hooks = hooks
+        self.roles = roles
+        self.show_parent_in_label = show_parent_in_label
+        self.use_adjective = use_adjective
+        self.include_blurb = include_blurb
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self._FIELDS)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._FIELDS)
+        return f"{self.__class__.__name__}({fields})"
+
+    @property
+    def subclasses(self) -> Tuple[str, ...]:
+        return tuple(self.catalog.subclass_names[i] for i in self.subclass_ids)
+
+    @property
+    def parents(self) -> Tuple[str, ...]:
+        return tuple(self.catalog.parent_of(i) for i in self.subclass_ids)
+
+    @property
+    def key(self) -> Tuple[Tuple[str, int], ...]:
+        """``(subclass, level)`` pairs sorted by subclass, as in ``BuildKey``."""
+        return tuple(sorted(zip(self.subclasses, self.levels)))
+
+    @property
+    def blurb(self) -> str:
+        return self.catalog.themes.get(self.adjective, "themed build")
+
+    @cached_property
+    def name(self) -> str:
+        return join_name(self.adjective, self.hooks, self.roles, self.use_adjective)
 
-        return f"{self.subclass} {final_levels}"
+    @cached_property
+    def line(self) -> str:
+        core = " / ".join(
+            sorted(
+                self.catalog.label(subclass_id, level, self.show_parent_in_label)
+                for subclass_id, level in zip(self.subclass_ids, self.levels)
+            )
+        )
+        blurb = self.blurb
+        return f"{core} ({blurb})" if self.include_blurb and blurb else core
@@ -0,0 +1,182 @@
+import itertools
+import math
+import random
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Iterator, List, Optional, Tuple, Union
+
+from .catalog import Catalog
+from .generator import BuildGenerator
+from .models import Build
+from .stats import GenerationStats
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+
+# Builds per chunk. Chunk boundaries, and therefore seeds, depend only on this
+# and ``n``, never on the worker count, which keeps the output identical for
+# any number of workers.
+DEFAULT_CHUNK_SIZE = 1000
+
+# Set once per worker process by ``_init_worker``.
+_worker_generator: Optional[BuildGenerator] = None
+
+
+def chunk_rng(seed: int, chunk_index: int) -> random.Random:
+    """Return the random stream for one chunk of a seeded bulk run."""
+    return random.Random(f"{seed}/{chunk_index}")
+
+
+def chunk_counts(n: Optional[int], chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Split a run of ``n`` builds (endless when None) into (chunk index, build count) pairs."""
+    for index in itertools.count():
+        start = index * chunk_size
+        if n is not None and start >= n:
+            return
+        yield index, chunk_size if n is None else min(chunk_size, n - start)
+
+
+def _init_worker(catalog_path: str, kwargs: dict) -> None:
+    from .shared_catalog import map_catalog_file
+
+    global _worker_generator
+    _worker_generator = BuildGenerator(map_catalog_file(catalog_path), **kwargs)
+
+
+def _generate_chunk(
+    task: Tuple[int, int, int, bool, bool],
+) -> Tuple[list, Optional[GenerationStats]]:
+    seed, chunk_index, count, collect_stats, records = task
+    stats = GenerationStats() if collect_stats else None
+    rng = chunk_rng(seed, chunk_index)
+    if records:
+        builds = _worker_generator.generate_builds(count, rng=rng, stats=stats)
+        # The parent has the catalog; sending it back would pickle a copy.
+        for build in builds:
+            build.catalog = None
+    else:
+        builds = _worker_generator.generate(count, rng=rng, stats=stats)
+    return builds, stats
+
+
+def iter_builds(
+    catalog: Catalog,
+    n: Optional[int] = None,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    deadline: Optional[float] = None,
+    stats: Optional[GenerationStats] = None,
+    records: bool = False,
+    **kwargs,
+) -> Iterator[Union[Tuple[str, str], Build]]:
+    """Yield ``(name, line)`` builds, or ``Build`` records with ``records=True``, one at a time.
+
+    Generation stops after ``n`` builds (never, when ``n`` is None) or once
+    ``time.monotonic()`` passes ``deadline``, whichever comes first. Builds use
+    the same chunked seeding as ``generate_parallel``, so a seeded stream starts
+    with exactly the builds that ``generate_parallel`` returns. With several
+    workers only a few chunks are in flight at a time, so memory stays constant
+    however many builds are consumed. Worker statistics are merged into
+    ``stats`` as each chunk is consumed.
+    """
+    if seed is None:
+        seed = random.randrange(2**63)
+    chunks = chunk_counts(n, chunk_size)
+
+    if workers <= 1:
+        generator = BuildGenerator(catalog, **kwargs)
+        for chunk_index, count in chunks:
+            rng = chunk_rng(seed, chunk_index)
+            for _ in range(count):
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                yield generator.generate_build(rng, stats) if records else generator.generate_one(rng, stats)
+        return
+
+    # Imported here: process pools pull in multiprocessing and logging, which
+    # serial runs never need.
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .shared_catalog import SharedCatalog
+
+    # Workers map the catalog from a shared file, and records they send back
+    # come without it and are given this process's catalog.
+    shared = SharedCatalog(catalog)
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(shared.path, kwargs),
+    )
+    try:
+        pending: Deque["Future"] = deque()
+        for chunk_index, count in chunks:
+            task = (seed, chunk_index, count, stats is not None, records)
+            pending.append(executor.submit(_generate_chunk, task))
+            if len(pending) < 2 * workers:
+                continue
+            if not (yield from _drain_one(pending, catalog, deadline, stats)):
+                return
+        while pending:
+            if not (yield from _drain_one(pending, catalog, deadline, stats)):
+                return
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        shared.close()
+
+
+def _drain_one(
+    pending: Deque["Future"],
+    catalog: Catalog,
+    deadline: Optional[float],
+    stats: Optional[GenerationStats],
+):
+    # Yield the builds of the oldest chunk; return False once the deadline passed.
+    from concurrent.futures import TimeoutError
+
+    future = pending.popleft()
+    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+    try:
+        builds, chunk_stats = future.result(timeout=timeout)
+    except TimeoutError:
+        return False
+    if stats is not None:
+        stats.merge(chunk_stats)
+    for build in builds:
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        if isinstance(build, Build):
+            build.catalog = catalog
+        yield build
+    return True
+
+
+def generate_parallel(
+    catalog: Catalog,
+    n: int = 4,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **kwargs,
+) -> List[Tuple[str, str]]:
+    """Generate ``n`` builds in chunks spread over a process pool.
+
+    Each chunk draws from ``chunk_rng(seed, chunk_index)``, so a seeded run gives
+    the same builds in the same order for any ``workers`` value. Workers map
+    the catalog from a ``SharedCatalog`` file and get the settings once, when
+    the pool starts. Remaining
+    keyword arguments are passed to ``BuildGenerator``.
+    """
+    # No point starting more processes than there are chunks.
+    workers = min(workers, max(1, math.ceil(n / chunk_size)))
+    return list(
+        iter_builds(
+            catalog,
+            n=n,
+            seed=seed,
+            workers=workers,
+            chunk_size=chunk_size,
+            **kwargs,
+        )
+    )
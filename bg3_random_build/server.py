@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib import request as urllib_request
+
+from .catalog import Catalog, load_catalog
+from .cli import build_parser as build_cli_parser, generator_settings_from_args
+from .config import DEFAULTS
+from .generator_cache import GeneratorCache
+from .live_catalog import RELOAD_INTERVAL
+from .shared_catalog import SharedCatalog, map_catalog_file
+from .parallel import DEFAULT_CHUNK_SIZE, chunk_counts, chunk_rng
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BUILDS_PER_REQUEST = 10000
+
+# CLI options a request may set, under their argparse names. Everything else
+# (data paths, output and process options) belongs to the server.
+REQUEST_OPTIONS = (
+    "num",
+    "seed",
+    "level_cap",
+    "show_parent_in_label",
+    "ea_if_martial",
+    "prefer_ea_if_hybrid",
+    "martial_weight",
+    "caster_weight",
+    "hybrid_weight",
+    "no_theme",
+    "unique",
+)
+
+# Set once per worker process by ``_init_worker``: warm generators for the
+# shared catalog, or for one that follows edits to the CSVs.
+_worker_cache: Optional[GeneratorCache] = None
+
+
+def parse_request(payload: dict) -> Tuple[argparse.Namespace, Optional[List[str]]]:
+    """Validate a JSON request against the CLI defaults.
+
+    Returns the options as a CLI namespace plus the allowed subclasses (None
+    for all). Raises ValueError for unknown options or wrong types.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("request body must be a JSON object")
+    args = build_cli_parser().parse_args([])
+    subclasses = payload.get("subclasses")
+    if subclasses is not None and not (
+        isinstance(subclasses, list) and all(isinstance(name, str) for name in subclasses)
+    ):
+        raise ValueError("'subclasses' must be a list of subclass names")
+
+    for key, value in payload.items():
+        if key == "subclasses":
+            continue
+        if key not in REQUEST_OPTIONS:
+            raise ValueError(f"unknown option {key!r}")
+        default = getattr(args, key)
+        if isinstance(default, bool):
+            valid = isinstance(value, bool)
+        elif isinstance(default, float):
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        else:
+            # int options, and seed whose default is None.
+            valid = isinstance(value, int) and not isinstance(value, bool)
+            valid = valid or (key == "seed" and value is None)
+        if not valid:
+            raise ValueError(f"invalid value for {key!r}: {value!r}")
+        setattr(args, key, float(value) if isinstance(default, float) else value)
+
+    if not 1 <= args.num <= MAX_BUILDS_PER_REQUEST:
+        raise ValueError(f"'num' must be between 1 and {MAX_BUILDS_PER_REQUEST}")
+    return args, subclasses
+
+
+def _init_worker(
+    catalog_path: Optional[str],
+    reload_paths: Optional[Tuple[str, str]] = None,
+    reload_interval: float = RELOAD_INTERVAL,
+) -> None:
+    global _worker_cache
+    if reload_paths is None:
+        _worker_cache = GeneratorCache(catalog=map_catalog_file(catalog_path))
+    else:
+        _worker_cache = GeneratorCache(*reload_paths, poll_interval=reload_interval)
+
+
+def _generate(args: argparse.Namespace, subclasses: Optional[List[str]]) -> List[Tuple[str, str]]:
+    # Runs in a worker. Same seeding as the CLI, so a seeded request returns
+    # what `bg3-builds -n NUM --seed SEED` with the same options prints.
+    generator = _worker_cache.generator(subclasses, **generator_settings_from_args(args))
+    if args.unique:
+        rng = random.Random(args.seed) if args.seed is not None else None
+        return generator.generate(args.num, rng, unique=True)
+    seed = args.seed if args.seed is not None else random.randrange(2**63)
+    builds: List[Tuple[str, str]] = []
+    for chunk_index, count in chunk_counts(args.num, DEFAULT_CHUNK_SIZE):
+        builds.extend(generator.generate(count, rng=chunk_rng(seed, chunk_index)))
+    return builds
+
+
+class BuildServer(ThreadingHTTPServer):
+    """HTTP server that answers build requests from a pool of warm workers.
+
+    The catalog is compiled once and published as a ``SharedCatalog`` that
+    every worker process maps when the pool starts, so workers share one copy
+    of it. Each worker keeps its generators warm in a ``GeneratorCache``.
+    Request threads only parse JSON and wait on the pool, so
+    concurrent requests run in parallel up to ``workers``.
+
+    With ``reload_paths`` (the breakpoints and themes CSVs), each worker's
+    cache instead loads those files itself and picks up edits within
+    ``reload_interval`` seconds, without a restart. A request runs entirely
+    on the snapshot it started with.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        catalog: Catalog,
+        workers: int,
+        reload_paths: Optional[Tuple[str, str]] = None,
+        reload_interval: float = RELOAD_INTERVAL,
+    ):
+        # Reloading workers load the catalog themselves (from the disk cache
+        # the server just wrote), since each follows the CSVs on its own.
+        # Both exist before binding, whose failure calls server_close().
+        self.shared = SharedCatalog(catalog) if reload_paths is None else None
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.shared and self.shared.path, reload_paths, reload_interval),
+        )
+        super().__init__(address, _BuildRequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.shared is not None:
+            self.shared.close()
+
+
+class _BuildRequestHandler(BaseHTTPRequestHandler):
+    server: BuildServer
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        if self.path != "/builds":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            args, subclasses = parse_request(json.loads(self.rfile.read(length) or b"{}"))
+        except ValueError as e:  # includes malformed JSON
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            builds = self.server.executor.submit(_generate, args, subclasses).result()
+        except BrokenExecutor as e:
+            self._send_json(500, {"error": f"worker pool failed: {e}"})
+            return
+        except RuntimeError as e:
+            self._send_json(422, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"internal error: {e}"})
+            return
+        self._send_json(200, {"builds": [{"name": name, "line": line} for name, line in builds]})
+
+
+def request_builds(url: str, timeout: float = 60.0, **options) -> List[Tuple[str, str]]:
+    """Ask a running server for builds; ``options`` are the request JSON fields.
+
+    Raises ``urllib.error.HTTPError`` for rejected requests; its body holds
+    the JSON error message.
+    """
+    data = json.dumps(options).encode("utf-8")
+    req = urllib_request.Request(
+        url.rstrip("/") + "/builds",
+        data=data,
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib_request.urlopen(req, timeout=timeout) as response:
+        body = json.load(response)
+    return [(build["name"], build["line"]) for build in body["builds"]]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="bg3-builds serve",
+        description="Serve build generation over HTTP from a preloaded catalog.",
+    )
+    p.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on.")
+    p.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on.")
+    p.add_argument("--breakpoints", default=DEFAULTS.breakpoints_path, help="Path to breakpoints CSV.")
+    p.add_argument("--themes", default=DEFAULTS.themes_path, help="Path to themes CSV.")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes answering requests.")
+    p.add_argument(
+        "--reload-interval",
+        type=float,
+        default=0.0,
+        help="Seconds between checks of the CSVs for edits, which are then picked up without a restart; each worker then loads its own catalog. 0 (default) disables reloading.",
+    )
+    return p
+
+
+def main(argv=None) -> int:
+    argv = argv if argv is not None else sys.argv[1:]
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    try:
+        catalog = load_catalog(args.breakpoints, args.themes)
+    except Exception as e:
+        print(f"Error loading data: {e}", file=sys.stderr)
+        return 2
+
+    reload_paths = (args.breakpoints, args.themes) if args.reload_interval > 0 else None
+    try:
+        server = BuildServer((args.host, args.port), catalog, args.workers, reload_paths, args.reload_interval)
+    except OSError as e:
+        print(f"Error starting server: {e}", file=sys.stderr)
+        return 2
+    host, port = server.server_address[:2]
+    print(f"Serving builds on http://{host}:{port}/builds ({args.workers} workers)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+import mmap
+import os
+import tempfile
+from typing import Optional
+
+from .catalog import Catalog
+
+
+# Where published catalogs go: a RAM-backed directory when the system has one.
+SHARED_DIR: Optional[str] = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def write_catalog_file(path: str, catalog: Catalog) -> None:
+    """Write ``catalog.to_buffer()`` to ``path``, replacing any previous file atomically."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(catalog.to_buffer())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def map_catalog_file(path: str) -> Catalog:
+    """Memory-map a ``write_catalog_file`` file read-only and return its catalog.
+
+    The arrays are read straight from the mapping, so every process mapping
+    the same file shares one copy of them in memory. Replace the file with
+    ``write_catalog_file`` rather than rewriting it in place; processes keep
+    the version they mapped.
+    """
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return Catalog.from_buffer(mapping)
+
+
+class SharedCatalog:
+    """Publish a catalog to a file that worker processes attach to by path.
+
+    The catalog is written once (to ``/dev/shm`` when available). Pass
+    ``shared.path`` to each worker, e.g. through the pool initializer, and map
+    it there with ``map_catalog_file`` instead of sending a pickled copy or
+    parsing the CSVs. ``close()`` (or leaving the ``with`` block) deletes the
+    file; workers that already mapped it keep their mapping.
+    """
+
+    def __init__(self, catalog: Catalog, directory: Optional[str] = SHARED_DIR):
+        self.catalog = catalog
+        fd, self.path = tempfile.mkstemp(prefix="bg3-catalog-", suffix=".bin", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(catalog.to_buffer())
+        except BaseException:
+            os.remove(self.path)
+            raise
+
+    def close(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self) -> "SharedCatalog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,105 @@
+import time
+from contextlib import nullcontext
+from typing import Dict, List
+
+
+STAGES = ("subclasses", "breakpoints", "fill", "naming")
+
+# Why an attempt did not become a build. Duplicate parents and the wrong
+# martial/caster mix cannot happen any more: subclass combinations are drawn
+# exactly from each composition, and empty compositions are rejected up front.
+REJECTION_REASONS = (
+    "parent_set",  # the drawn parent classes can never fit the cap or reach a required Extra Attack
+    "level_cap",  # no breakpoint assignment of the drawn subclasses fits the cap
+    "extra_attack",  # Extra Attack was wanted but the fill could not reach it
+    "constraints",  # the final levels or theme broke a BuildConstraints rule
+    "pair_exhausted",  # every inner attempt for a (count, composition) draw failed
+    "duplicate",  # unique generation drew a build that was already issued
+)
+
+
+class _StageTimer:
+    __slots__ = ("stats", "stage", "start")
+
+    def __init__(self, stats: "GenerationStats", stage: str):
+        self.stats = stats
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats.stage_seconds[self.stage] += time.perf_counter() - self.start
+        self.stats.stage_calls[self.stage] += 1
+        return False
+
+
+_NO_TIMER = nullcontext()
+
+
+def no_stage(stage: str):
+    """Stand-in for ``GenerationStats.stage`` when no stats are collected."""
+    return _NO_TIMER
+
+
+class GenerationStats:
+    """Attempt, rejection and per-stage timing totals for generated builds.
+
+    Pass one to ``BuildGenerator.generate_one``/``generate`` (or ``iter_builds``)
+    to find out how much work each build took and which constraint rejected
+    the attempts that failed. Collecting costs a few timer calls per attempt;
+    without a collector the generator skips all of it.
+    """
+
+    def __init__(self):
+        self.builds = 0
+        self.failures = 0
+        self.attempts = 0
+        self.pair_draws = 0
+        self.rejections: Dict[str, int] = dict.fromkeys(REJECTION_REASONS, 0)
+        self.stage_seconds: Dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        self.stage_calls: Dict[str, int] = dict.fromkeys(STAGES, 0)
+
+    def stage(self, stage: str) -> _StageTimer:
+        return _StageTimer(self, stage)
+
+    def reject(self, reason: str) -> None:
+        self.rejections[reason] += 1
+
+    def merge(self, other: "GenerationStats") -> None:
+        self.builds += other.builds
+        self.failures += other.failures
+        self.attempts += other.attempts
+        self.pair_draws += other.pair_draws
+        for reason, count in other.rejections.items():
+            self.rejections[reason] = self.rejections.get(reason, 0) + count
+        for stage in other.stage_seconds:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + other.stage_seconds[stage]
+            self.stage_calls[stage] = self.stage_calls.get(stage, 0) + other.stage_calls[stage]
+
+    def as_dict(self) -> dict:
+        return {
+            "builds": self.builds,
+            "failures": self.failures,
+            "attempts": self.attempts,
+            "pair_draws": self.pair_draws,
+            "rejections": dict(self.rejections),
+            "stage_seconds": dict(self.stage_seconds),
+            "stage_calls": dict(self.stage_calls),
+        }
+
+    def report_lines(self) -> List[str]:
+        per_build = max(self.builds, 1)
+        lines = [
+            f"builds: {self.builds} (failed: {self.failures})",
+            f"attempts: {self.attempts} ({self.attempts / per_build:.2f} per build), "
+            f"count/composition draws: {self.pair_draws}",
+            "rejections: " + ", ".join(f"{reason} {count}" for reason, count in self.rejections.items()),
+        ]
+        for stage in self.stage_seconds:
+            lines.append(
+                f"{stage}: {self.stage_seconds[stage] * 1000:.1f} ms "
+                f"over {self.stage_calls[stage]} calls"
+            )
+        return lines
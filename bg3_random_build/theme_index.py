@@ -0,0 +1,101 @@
+import copy
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .data_io import ThemeRequirements
+from .logic import _resolve_rng, normalize_theme_requirements
+
+
+# One requirement alternative: the capability bits it needs, and whether it is
+# martial-gated (see ``logic._has_martial_theme_access``).
+Alternative = Tuple[int, bool]
+
+
+class ThemeIndex:
+    """Theme requirements compiled to integer capability bitmasks.
+
+    Builds are described by the bitmask of their combined capabilities. The
+    adjectives that fit a given ``(mask, has_martial_access)`` pair are worked
+    out once and cached, and only a small number of distinct masks occur in
+    practice, so picking a theme is usually one dict lookup.
+    """
+
+    def __init__(self, themes: Dict[str, str], theme_requirements: ThemeRequirements):
+        self.themes = themes
+        self.bits: Dict[str, int] = {}
+        normalized = normalize_theme_requirements(theme_requirements)
+        self.requirements: List[Tuple[str, Tuple[Alternative, ...]]] = [
+            (
+                adjective,
+                tuple(
+                    (self.mask_for(required), "martial" in required)
+                    for required in normalized.get(adjective, [])
+                ),
+            )
+            for adjective in themes
+        ]
+        self._fitting: Dict[Tuple[int, bool], Tuple[str, ...]] = {}
+
+    @classmethod
+    def from_compiled(
+        cls,
+        themes: Dict[str, str],
+        capabilities: Iterable[str],
+        requirements: List[Tuple[str, Tuple[Alternative, ...]]],
+    ) -> "ThemeIndex":
+        """Rebuild an index from its capability names in bit order and compiled requirements."""
+        out = cls.__new__(cls)
+        out.themes = themes
+        out.bits = {capability: 1 << i for i, capability in enumerate(capabilities)}
+        out.requirements = requirements
+        out._fitting = {}
+        return out
+
+    def mask_for(self, capabilities: Iterable[str]) -> int:
+        """Return the bitmask for capability names, assigning new bits as needed."""
+        mask = 0
+        for capability in capabilities:
+            bit = self.bits.get(capability)
+            if bit is None:
+                bit = self.bits[capability] = 1 << len(self.bits)
+            mask |= bit
+        return mask
+
+    def extended(self) -> "ThemeIndex":
+        """Return a copy that can assign new capability bits without touching this one.
+
+        The copy shares the cached ``fitting`` lookups: extra bits are not in
+        any requirement, so they never change which adjectives fit.
+        """
+        out = copy.copy(self)
+        out.bits = dict(self.bits)
+        return out
+
+    def fitting(self, mask: int, has_martial_access: bool) -> Tuple[str, ...]:
+        key = (mask, has_martial_access)
+        fitting = self._fitting.get(key)
+        if fitting is None:
+            fitting = self._fitting[key] = tuple(
+                adjective
+                for adjective, alternatives in self.requirements
+                if not alternatives
+                or any(
+                    required & mask == required and (not needs_martial or has_martial_access)
+                    for required, needs_martial in alternatives
+                )
+            )
+        return fitting
+
+    def pick(
+        self,
+        mask: int,
+        has_martial_access: bool,
+        rng: Optional[random.Random] = None,
+    ) -> str:
+        fitting = self.fitting(mask, has_martial_access)
+        if not fitting:
+            raise RuntimeError(
+                "No theme matches the selected subclasses' capabilities. "
+                "Add an unrestricted theme or review the capability tags."
+            )
+        return _resolve_rng(rng).choice(fitting)
@@ -0,0 +1,146 @@
+import json
+import os
+import random
+from typing import Iterable, List, Optional, Set
+
+from .distribution import enumerate_builds
+from .generator import BuildGenerator, BuildKey
+from .logic import _resolve_rng
+from .models import Build
+from .stats import GenerationStats, no_stage
+
+
+# When the whole build space has at most this many builds beyond the ones
+# requested it is enumerated, so an impossible request is reported up front
+# and builds are drawn without replacement instead of being regenerated until
+# they are new. The issued set does not raise the limit: it can be far larger
+# than the space (or hold builds of an older catalog), and only the issued
+# keys the enumeration finds count against it.
+UNIQUE_ENUMERATION_LIMIT = 5000
+
+
+def load_issued_builds(path: str) -> Set[BuildKey]:
+    """Read a set of previously issued builds; a missing file is an empty set."""
+    issued: Set[BuildKey] = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    issued.add(tuple((subclass, int(level)) for subclass, level in json.loads(line)))
+    except FileNotFoundError:
+        pass
+    return issued
+
+
+def save_issued_builds(path: str, issued: Iterable[BuildKey]) -> None:
+    """Write issued builds, one JSON list of ``[subclass, level]`` pairs per line."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for key in sorted(issued):
+            f.write(json.dumps([list(pair) for pair in key]) + "\n")
+    os.replace(tmp_path, path)
+
+
+def _distribution_for(generator: BuildGenerator, limit: int):
+    return enumerate_builds(
+        generator.catalog,
+        level_cap=generator.level_cap,
+        num_subclass_weights=generator.num_subclass_weights,
+        composition_weights=generator.composition_weights,
+        require_ea_if_martial=generator.require_ea_if_martial,
+        prefer_ea_if_hybrid=generator.prefer_ea_if_hybrid,
+        limit=limit,
+    )
+
+
+def generate_unique(
+    generator: BuildGenerator,
+    n: int,
+    rng: Optional[random.Random] = None,
+    issued: Optional[Set[BuildKey]] = None,
+    stats: Optional[GenerationStats] = None,
+) -> List[Build]:
+    """Generate ``n`` builds with distinct subclasses and levels, none of them in ``issued``.
+
+    The keys of the returned builds are added to ``issued``, so passing the
+    same set (e.g. from ``load_issued_builds``) to later calls never repeats a
+    build. Raises RuntimeError before generating anything when fewer than
+    ``n`` new builds exist.
+
+    Small build spaces are enumerated and drawn from without replacement,
+    which gives the same builds as regenerating until new with none of the
+    wasted attempts. Large spaces cannot run out, and duplicates there are
+    rare, so those are simply regenerated. So are builds under constraints or
+    drawn theme first; there, RuntimeError is raised once
+    ``max_global_attempts`` duplicates in a row suggest the space is used up.
+    """
+    rng = _resolve_rng(rng if rng is not None else generator.rng)
+    if issued is None:
+        issued = set()
+    generator.check_feasible()
+    distribution = None
+    if generator.constraints is None and not generator.theme_first:
+        # enumerate_builds knows neither constraints nor theme-first draws.
+        distribution = _distribution_for(generator, n + UNIQUE_ENUMERATION_LIMIT)
+
+    builds: List[Build] = []
+    if distribution is None:
+        duplicates = 0
+        while len(builds) < n:
+            chosen, finals, adjective = generator.draw(rng, stats)
+            key = generator.build_key(chosen, finals)
+            if key in issued:
+                if stats is not None:
+                    stats.reject("duplicate")
+                duplicates += 1
+                if duplicates > generator.max_global_attempts:
+                    raise RuntimeError(
+                        f"Found only {len(builds)} new distinct builds for these settings, {n} requested."
+                    )
+                continue
+            duplicates = 0
+            issued.add(key)
+            with no_stage("naming") if stats is None else stats.stage("naming"):
+                builds.append(generator.build(chosen, finals, rng, adjective))
+            if stats is not None:
+                stats.builds += 1
+        return builds
+
+    remaining = {key: probability for key, probability in distribution.items() if key not in issued}
+    if len(remaining) < n:
+        raise RuntimeError(
+            f"Only {len(remaining)} new distinct builds exist for these settings "
+            f"({len(distribution)} in total), {n} requested."
+        )
+
+    subclass_ids = generator.catalog.subclass_ids
+    keys: List[BuildKey] = []
+    cum_weights: List[float] = []
+    live_mass = 0.0
+    while len(builds) < n:
+        # Draw from the remaining builds by rejecting drawn ones, and rebuild
+        # the table once half of its mass has been drawn, so each build costs
+        # at most two draws on average.
+        if not keys or live_mass < cum_weights[-1] / 2:
+            keys = list(remaining)
+            cum_weights = []
+            live_mass = 0.0
+            for key in keys:
+                live_mass += remaining[key]
+                cum_weights.append(live_mass)
+        key = rng.choices(keys, cum_weights=cum_weights, k=1)[0]
+        if key not in remaining:
+            continue
+        live_mass -= remaining.pop(key)
+        issued.add(key)
+
+        # The generator's pick order is random; naming breaks ties with it.
+        picks = [(subclass_ids[subclass], level) for subclass, level in key]
+        rng.shuffle(picks)
+        chosen = [subclass_id for subclass_id, _ in picks]
+        finals = [level for _, level in picks]
+        with no_stage("naming") if stats is None else stats.stage("naming"):
+            builds.append(generator.build(chosen, finals, rng))
+        if stats is not None:
+            stats.builds += 1
+    return builds
@@ -1,11 +1,11 @@
 import pathlib
-from collections import OrderedDict
+import random
 
 import streamlit as st
 
 from bg3_random_build.config import DEFAULTS
-from bg3_random_build.data_io import load_breakpoints, load_themes
-from bg3_random_build.logic import suggest_many
+from bg3_random_build.generator_cache import shared_cache
+from bg3_random_build.stats import GenerationStats
 
 
 HERE = pathlib.Path(__file__).resolve().parent
@@ -18,59 +18,44 @@ DEFAULT_COMPOSITION_WEIGHTS = getattr(
 ) or {"martial": 0.25, "caster": 0.35, "hybrid": 0.40}
 
 
-def _load_breakpoints(path: str):
-    # These CSVs are tiny. Avoid Streamlit's persistent cache here because
-    # cached values from the old CSV schema can survive an app upgrade.
-    return load_breakpoints(path)
-
-
-def _load_themes(path: str):
-    return load_themes(path)
-
-
-def _subclasses_by_parent(sub_bps):
-    grouped = OrderedDict()
-    for bp in sub_bps:
-        grouped.setdefault(bp.parent_class, [])
-        if bp.subclass not in grouped[bp.parent_class]:
-            grouped[bp.parent_class].append(bp.subclass)
-    return grouped
-
-
 st.set_page_config(page_title="BG3 Random Build Generator", page_icon="", layout="centered")
 st.title(" BG3 Random Build Generator")
 st.caption("Generate random, probably silly, BG3 build suggestions.\nSee it as a challenge ;)")
 
-err = None
-try:
-    sub_bps_all = _load_breakpoints(str(DEFAULT_BREAKPOINTS))
-except Exception as e:
-    sub_bps_all = []
-    err = f"Error loading breakpoints: {e}"
-
+# Avoid Streamlit's persistent cache here because cached values from the old
+# CSV schema can survive an app upgrade. The package's cache lives in the
+# running process, follows CSV edits and is shared by all sessions, so reruns
+# reuse the compiled catalog and warm generators.
+cache = shared_cache(str(DEFAULT_BREAKPOINTS), str(DEFAULT_THEMES))
 try:
-    themes, theme_reqs = _load_themes(str(DEFAULT_THEMES))
+    grouped = cache.subclasses_by_parent()
 except Exception as e:
-    themes, theme_reqs = {}, {}
-    err = f"Error loading themes: {e}" if not err else err + f" | {e}"
-
-if err:
-    st.error(err)
+    st.error(f"Error loading breakpoints or themes: {e}")
     st.stop()
 
+# One RNG per browser session, so concurrent sessions never share random
+# state, and one session's builds do not depend on what others generate.
+if "rng" not in st.session_state:
+    st.session_state.rng = random.Random()
+rng = st.session_state.rng
+
 n = st.number_input("Number of builds", min_value=1, max_value=20, value=4, step=1)
 include_theme = st.checkbox(
     "Include build \"theme\" (might be silly)",
     value=True,
     help="When off, only suggest class levels and simple names.",
 )
+unique = st.checkbox(
+    "No duplicate builds",
+    value=False,
+    help="Never show the same subclasses at the same levels twice in one batch.",
+)
 
 with st.expander("Subclass picker"):
     st.caption(
         "Choose which subclasses are allowed in the generator. "
         "Leave a class empty to exclude that parent class entirely."
     )
-    grouped = _subclasses_by_parent(sub_bps_all)
 
     # Remove stale widget state left by classes that disappeared from the CSV
     # This matters after a hot reload or deployment.
@@ -119,9 +104,7 @@ composition_weights = {
     "hybrid": hybrid_weight,
 }
 
-sub_bps = [bp for bp in sub_bps_all if bp.subclass in selected_subclasses]
-
-if not sub_bps:
+if not selected_subclasses:
     st.error("Select at least one subclass before generating builds.")
     st.stop()
 
@@ -129,22 +112,58 @@ if sum(composition_weights.values()) <= 0:
     st.error("At least one composition weight must be greater than zero.")
     st.stop()
 
-if st.button("Generate"):
+generator = cache.generator(
+    selected_subclasses,
+    composition_weights=composition_weights,
+    use_adjective=include_theme,
+    include_blurb=include_theme,
+)
+
+# Computed when the generator is built, so bad settings show up immediately
+# instead of after a slow failed generation.
+analysis = generator.analysis()
+if not analysis.feasible:
+    st.error(
+        "No build can be generated with the current subclasses and weights:\n\n"
+        + "\n".join(f"- {message}" for message in analysis.messages())
+    )
+
+with st.expander("Outcome odds"):
+    st.caption(
+        "Chance that each subclass count and composition is drawn with the current settings. "
+        "Draws that cannot fit the level cap are redrawn, so large builds under a low cap come up less often."
+    )
+    st.json(
+        {
+            "subclasses": {str(k): round(p, 3) for k, p in sorted(analysis.k_probabilities(draws=True).items())},
+            "composition": {
+                comp: round(p, 3) for comp, p in analysis.composition_probabilities(draws=True).items()
+            },
+            "impossible": analysis.messages(),
+        }
+    )
+
+if st.button("Generate", disabled=not analysis.feasible):
+    stats = GenerationStats()
     try:
-        builds = suggest_many(
-            sub_bps,
-            themes,
-            theme_reqs,
-            n=int(n),
-            composition_weights=composition_weights,
-            use_adjective=include_theme,
-            include_blurb=include_theme,
-        )
+        if unique:
+            # Checks up front that enough distinct builds exist.
+            builds = generator.generate(int(n), rng=rng, stats=stats, unique=True)
+        else:
+            builds = (generator.generate_one(rng=rng, stats=stats) for _ in range(int(n)))
     except Exception as e:
         st.error(f"Could not generate builds with the current settings: {e}")
         st.stop()
-
-    for name, line in builds:
-        with st.container(border=True):
-            st.markdown(f"### {name}")
-            st.write(line)
+    try:
+        # Render each card as soon as its build is ready.
+        for name, line in builds:
+            with st.container(border=True):
+                st.markdown(f"### {name}")
+                st.write(line)
+    except Exception as e:
+        st.error(f"Could not generate builds with the current settings: {e}")
+        st.stop()
+    finally:
+        with st.expander("Debug: generation stats"):
+            st.caption("Attempts, rejection reasons and time per stage for this batch.")
+            st.json(stats.as_dict())
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bg3_random_build.async_api import (
+    CANCELLED,
+    COMPLETE,
+    DEADLINE,
+    INFEASIBLE,
+    generate_async,
+    generate_within,
+)
+from bg3_random_build.catalog import load_catalog
+from bg3_random_build.generator import BuildGenerator
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# More builds than any test has time to generate.
+ENDLESS = 10**9
+
+
+@pytest.fixture(scope="module")
+def generator():
+    catalog = load_catalog(
+        os.path.join(ROOT, "breakpoints.csv"),
+        os.path.join(ROOT, "themes.csv"),
+        use_cache=False,
+    )
+    return BuildGenerator(catalog)
+
+
+def test_complete(generator):
+    result = asyncio.run(generate_async(generator, 5, timeout=30, rng=random.Random(1)))
+    assert result.reason == COMPLETE and result.complete
+    assert result.builds == generator.generate(5, rng=random.Random(1))
+
+
+def test_deadline_keeps_finished_builds(generator):
+    start = time.monotonic()
+    result = asyncio.run(generate_async(generator, ENDLESS, timeout=0.2, rng=random.Random(2)))
+    assert result.reason == DEADLINE and not result.complete
+    assert 0 < len(result.builds) < ENDLESS
+    assert time.monotonic() - start < 5
+
+    assert generate_within(generator, 5, deadline=time.monotonic()).reason == DEADLINE
+
+
+def test_cancel(generator):
+    cancel = threading.Event()
+    cancel.set()
+    result = generate_within(generator, 5, cancel=cancel)
+    assert result.reason == CANCELLED
+    assert result.builds == []
+
+    async def cancelled_call(executor):
+        task = asyncio.ensure_future(generate_async(generator, ENDLESS, executor=executor))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        asyncio.run(cancelled_call(executor))
+        # The worker thread stops at its next check instead of running on.
+        start = time.monotonic()
+        executor.shutdown(wait=True)
+        assert time.monotonic() - start < 5
+
+
+def test_infeasible_settings_report_a_reason(generator):
+    casters = BuildGenerator(
+        generator.catalog.subset(("Evocation", "Life")),
+        composition_weights={"martial": 1.0, "caster": 0.0, "hybrid": 0.0},
+    )
+    result = generate_within(casters, 3)
+    assert result.reason == INFEASIBLE
+    assert result.builds == [] and result.message
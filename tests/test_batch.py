@@ -0,0 +1,53 @@
+import math
+import os
+from collections import Counter
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bg3_random_build.batch import iter_batch_builds
+from bg3_random_build.catalog import load_catalog
+from bg3_random_build.distribution import enumerate_builds
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETTINGS = {"level_cap": 5}
+SAMPLES = 60000
+
+
+def test_batch_sampler_matches_exact_distribution():
+    catalog = load_catalog(
+        os.path.join(ROOT, "breakpoints.csv"),
+        os.path.join(ROOT, "themes.csv"),
+        use_cache=False,
+    )
+    expected = enumerate_builds(catalog, **SETTINGS)
+    counts = Counter(
+        build.key for build in iter_batch_builds(catalog, n=SAMPLES, seed=7, records=True, **SETTINGS)
+    )
+
+    assert set(counts) <= set(expected)
+
+    # Pearson's chi-square over builds expected at least 10 times, with the
+    # rest pooled into one cell. Its mean is df and its standard deviation
+    # sqrt(2 df); allow six standard deviations.
+    chi2 = 0.0
+    df = 0
+    pooled_observed = SAMPLES
+    pooled_expected = float(SAMPLES)
+    for key, probability in expected.items():
+        mean = probability * SAMPLES
+        if mean < 10:
+            continue
+        chi2 += (counts[key] - mean) ** 2 / mean
+        df += 1
+        pooled_observed -= counts[key]
+        pooled_expected -= mean
+    if pooled_expected >= 10:
+        chi2 += (pooled_observed - pooled_expected) ** 2 / pooled_expected
+        df += 1
+    df -= 1
+
+    assert df > 20
+    assert chi2 < df + 6 * math.sqrt(2 * df)
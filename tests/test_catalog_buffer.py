@@ -0,0 +1,73 @@
+import os
+import pickle
+import random
+
+import pytest
+
+from bg3_random_build.catalog import Catalog, load_catalog
+from bg3_random_build.generator import BuildGenerator
+from bg3_random_build.shared_catalog import map_catalog_file, write_catalog_file
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _fields(catalog):
+    return {
+        "subclass_names": list(catalog.subclass_names),
+        "parent_names": list(catalog.parent_names),
+        "subclass_parent": list(catalog.subclass_parent),
+        "level_options": [catalog.level_options(i) for i in range(len(catalog))],
+        "capability_masks": list(catalog.capability_masks),
+        "ea_thresholds": list(catalog.ea_thresholds),
+        "subclasses_by_parent": [list(group) for group in catalog.subclasses_by_parent],
+        "subclass_ids": dict(catalog.subclass_ids),
+        "themes": dict(catalog.themes),
+        "bits": dict(catalog.theme_index.bits),
+        "requirements": [(adjective, tuple(alts)) for adjective, alts in catalog.theme_index.requirements],
+    }
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog(
+        os.path.join(ROOT, "breakpoints.csv"),
+        os.path.join(ROOT, "themes.csv"),
+        use_cache=False,
+    )
+
+
+def test_buffer_round_trip(catalog, tmp_path):
+    copy = Catalog.from_buffer(catalog.to_buffer())
+    assert _fields(copy) == _fields(catalog)
+    assert _fields(pickle.loads(pickle.dumps(copy))) == _fields(catalog)
+
+    path = str(tmp_path / "catalog.bin")
+    write_catalog_file(path, catalog)
+    mapped = map_catalog_file(path)
+    assert _fields(mapped) == _fields(catalog)
+
+    def builds(source):
+        return BuildGenerator(source, theme_first=True).generate(200, rng=random.Random(6))
+
+    assert builds(mapped) == builds(catalog)
+
+
+def test_buffer_round_trip_with_wide_masks():
+    # More capabilities than fit in one 64-bit mask word.
+    capabilities = [f"cap{i}" for i in range(150)]
+    rows = [
+        ("Champion", [1, 3], "Fighter", frozenset(capabilities[::2])),
+        ("Evocation", [2, 6], "Wizard", frozenset(capabilities[1::2] + ["martial"])),
+        ("Thief", [3], "Rogue", frozenset(capabilities[140:])),
+    ]
+    themes = {"Plain": "No requirements.", "Rare": "Needs the last capability."}
+    requirements = {"Rare": [frozenset({"cap149"}), frozenset({"cap0", "cap1"})]}
+    catalog = Catalog(rows, themes, requirements)
+    assert catalog.capability_masks[2] >= 1 << 64
+
+    copy = Catalog.from_buffer(catalog.to_buffer())
+    assert _fields(copy) == _fields(catalog)
+    assert _fields(pickle.loads(pickle.dumps(copy))) == _fields(catalog)
+    with pytest.raises(IndexError):
+        copy.capability_masks[len(copy)]
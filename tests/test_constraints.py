@@ -0,0 +1,70 @@
+import os
+import random
+
+import pytest
+
+from bg3_random_build.analysis import has_martial_access, martial_access_level
+from bg3_random_build.catalog import load_catalog
+from bg3_random_build.constraints import BuildConstraints
+from bg3_random_build.generator import BuildGenerator
+from bg3_random_build.stats import GenerationStats
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = 500
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog(
+        os.path.join(ROOT, "breakpoints.csv"),
+        os.path.join(ROOT, "themes.csv"),
+        use_cache=False,
+    )
+
+
+def adjective_fits(catalog, build) -> bool:
+    mask = 0
+    for subclass_id in build.subclass_ids:
+        mask |= catalog.capability_masks[subclass_id]
+    access = [
+        martial_access_level(catalog.parent_of(subclass_id), catalog.ea_thresholds[subclass_id])
+        for subclass_id in build.subclass_ids
+    ]
+    return build.adjective in catalog.theme_index.fitting(mask, has_martial_access(build.levels, access))
+
+
+@pytest.mark.parametrize(
+    "constraints",
+    [
+        BuildConstraints(subclasses=("Thief",), capabilities=("fire",)),
+        BuildConstraints(capabilities=("martial", "healer")),
+        BuildConstraints(parent_levels={"Rogue": (4, 8), "Wizard": (0, 0)}),
+        BuildConstraints(adjective="Serrated", parent_levels={"Fighter": (1, 3)}),
+        BuildConstraints(adjective="Pristine", subclasses=("Life",)),
+    ],
+)
+def test_constrained_builds_meet_the_constraints(catalog, constraints):
+    generator = BuildGenerator(catalog, constraints=constraints)
+    stats = GenerationStats()
+    builds = generator.generate_builds(SAMPLES, rng=random.Random(2), stats=stats)
+
+    bits = catalog.theme_index.bits
+    required_mask = sum(bits[capability] for capability in constraints.capabilities)
+    for build in builds:
+        assert sum(build.levels) == generator.level_cap
+        assert set(constraints.subclasses) <= set(build.subclasses)
+        mask = 0
+        for subclass_id in build.subclass_ids:
+            mask |= catalog.capability_masks[subclass_id]
+        assert mask & required_mask == required_mask
+        levels = dict(zip(build.parents, build.levels))
+        for parent, (low, high) in constraints.parent_levels.items():
+            assert low <= levels.get(parent, 0) <= high
+        if constraints.adjective is not None:
+            assert build.adjective == constraints.adjective
+        assert adjective_fits(catalog, build)
+
+    # Level ranges are drawn within, so only martial-gated adjectives reject.
+    if constraints.adjective is None:
+        assert stats.rejections["constraints"] == 0
@@ -0,0 +1,43 @@
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from bg3_random_build.logic import ea_threshold, fill_outcomes, fill_to_cap_with_preferences
+from bg3_random_build.models import SubBreakpoint
+
+
+SAMPLES = 20000
+
+# Picks in pick order, the level cap and the Extra Attack wish. They cover the
+# Extra Attack top-up with tied candidates, odd levels and the +2 rounds.
+CASES = [
+    ([("Champion", 1, "Fighter"), ("Evocation", 2, "Wizard")], 12, True),
+    ([("Champion", 1, "Fighter"), ("Berserker", 1, "Barbarian"), ("Life", 1, "Cleric")], 12, True),
+    ([("Valour", 3, "Bard"), ("Thief", 3, "Rogue"), ("Storm", 1, "Sorcerer")], 12, False),
+    ([("Bladesinging", 2, "Wizard"), ("Hunter", 3, "Ranger")], 11, True),
+    ([("Open Hand", 1, "Monk"), ("Thief", 1, "Rogue"), ("Life", 1, "Cleric"), ("Storm", 1, "Sorcerer")], 12, False),
+]
+
+
+@pytest.mark.parametrize("picks, cap, want_ea", CASES)
+def test_fill_outcomes_match_sampled_fill(picks, cap, want_ea):
+    picks = [SubBreakpoint(subclass, levels, parent) for subclass, levels, parent in picks]
+    thresholds = tuple(ea_threshold(bp.parent_class, bp.subclass) or 0 for bp in picks)
+    expected = dict(
+        fill_outcomes(tuple(bp.levels for bp in picks), thresholds, want_ea, cap, ties_by_position=True)
+    )
+    assert math.isclose(sum(expected.values()), 1.0)
+
+    rng = random.Random(5)
+    counts = Counter()
+    for _ in range(SAMPLES):
+        finals = fill_to_cap_with_preferences(picks, cap, want_ea, rng)
+        counts[tuple(finals[(bp.subclass, bp.parent_class)] for bp in picks)] += 1
+
+    assert set(counts) <= set(expected)
+    # Each outcome's count is binomial; allow five standard deviations.
+    for finals, probability in expected.items():
+        mean = probability * SAMPLES
+        assert abs(counts[finals] - mean) <= 5 * math.sqrt(mean * (1 - probability)) + 1
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+from bg3_random_build.bench import IMPORT_BUDGET_RATIO, measure_import_ratio
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a plain ``python -m bg3_random_build.cli -n 1`` run must not load.
+HEAVY_MODULES = (
+    "numpy",
+    "concurrent.futures.process",
+    "bg3_random_build.server",
+    "bg3_random_build.constraints",
+    "bg3_random_build.distribution",
+    "bg3_random_build.shared_catalog",
+    "dataclasses",
+    "csv",
+    "json",
+)
+
+
+def test_cli_import_within_budget():
+    assert measure_import_ratio() <= IMPORT_BUDGET_RATIO
+
+
+def test_plain_run_skips_heavy_modules():
+    code = (
+        "import sys\n"
+        "from bg3_random_build.cli import main\n"
+        "main(['-n', '1', '--seed', '1'])\n"
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT)
+    assert proc.stdout.splitlines()[-1] == "[]"
@@ -0,0 +1,65 @@
+import os
+import shutil
+
+from bg3_random_build.live_catalog import LiveCatalog
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    # Make sure the poll sees a new mtime even on coarse filesystem clocks.
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def _live_catalog(tmp_path):
+    breakpoints = str(tmp_path / "breakpoints.csv")
+    themes = str(tmp_path / "themes.csv")
+    shutil.copy(os.path.join(ROOT, "breakpoints.csv"), breakpoints)
+    shutil.copy(os.path.join(ROOT, "themes.csv"), themes)
+    return LiveCatalog(breakpoints, themes, poll_interval=0, use_cache=False), breakpoints
+
+
+def test_edit_is_picked_up_and_old_snapshot_kept(tmp_path):
+    live, breakpoints = _live_catalog(tmp_path)
+    before = live.snapshot()
+    assert "Champion" in before.subclass_ids
+
+    with open(breakpoints, encoding="utf-8") as f:
+        lines = f.read().splitlines(keepends=True)
+    _write(breakpoints, "".join(line for line in lines if not line.startswith("Champion,")))
+
+    after = live.snapshot()
+    assert after is not before
+    assert live.version == 1
+    assert "Champion" not in after.subclass_ids
+    assert len(after) == len(before) - 1
+    # Breakpoints-only edits keep the theme index.
+    assert after.theme_index is before.theme_index
+    # Snapshots are never changed in place.
+    assert "Champion" in before.subclass_ids
+
+    assert not live.poll()  # nothing changed since
+
+
+def test_half_written_file_keeps_last_good_catalog(tmp_path):
+    live, breakpoints = _live_catalog(tmp_path)
+    before = live.snapshot()
+
+    with open(breakpoints, encoding="utf-8") as f:
+        text = f.read()
+    _write(breakpoints, text[: text.index("\n", text.index("\n") + 1) + len("Berserker,5;7")])
+
+    assert live.snapshot() is before
+    assert live.version == 0
+    assert isinstance(live.last_error, ValueError)
+
+    # Finishing the write is picked up on the next poll.
+    _write(breakpoints, text.replace("Berserker,5;7,", "Berserker,5,"))
+    after = live.snapshot()
+    assert after is not before
+    assert live.last_error is None
+    assert after.level_options(after.subclass_ids["Berserker"]) == (5,)
@@ -0,0 +1,23 @@
+import os
+
+from bg3_random_build.catalog import load_catalog
+from bg3_random_build.parallel import generate_parallel, iter_builds
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_output_does_not_depend_on_workers():
+    catalog = load_catalog(
+        os.path.join(ROOT, "breakpoints.csv"),
+        os.path.join(ROOT, "themes.csv"),
+        use_cache=False,
+    )
+    settings = {"n": 600, "seed": 11, "chunk_size": 50}
+    single = generate_parallel(catalog, workers=1, **settings)
+    assert len(single) == 600
+    assert generate_parallel(catalog, workers=3, **settings) == single
+
+    records = list(iter_builds(catalog, workers=3, records=True, **settings))
+    assert [(build.name, build.line) for build in records] == single
+    assert all(build.catalog is catalog for build in records)
@@ -0,0 +1,67 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from bg3_random_build.catalog import load_catalog
+from bg3_random_build.server import BuildServer, request_builds
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def url():
+    catalog = load_catalog(
+        os.path.join(ROOT, "breakpoints.csv"),
+        os.path.join(ROOT, "themes.csv"),
+        use_cache=False,
+    )
+    server = BuildServer(("127.0.0.1", 0), catalog, workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _post(url, body: bytes):
+    req = urllib.request.Request(url + "/builds", data=body, headers={"Content-Type": "application/json"})
+    with pytest.raises(urllib.error.HTTPError) as info:
+        urllib.request.urlopen(req, timeout=60)
+    return info.value.code, json.load(info.value)
+
+
+def test_builds_are_reproducible(url):
+    builds = request_builds(url, num=5, seed=3)
+    assert len(builds) == 5
+    assert request_builds(url, num=5, seed=3) == builds
+    assert all(line.startswith("Champion 12") for _, line in request_builds(url, num=3, subclasses=["Champion"]))
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        (b"{not json", "Expecting"),
+        (b"[1, 2]", "must be a JSON object"),
+        (b'{"colour": "red"}', "unknown option 'colour'"),
+        (b'{"num": "3"}', "invalid value for 'num'"),
+        (b'{"num": 0}', "'num' must be between"),
+        (b'{"subclasses": "Champion"}', "'subclasses' must be a list"),
+    ],
+)
+def test_bad_requests_get_400(url, body, message):
+    status, error = _post(url, body)
+    assert status == 400
+    assert message in error["error"]
+
+
+def test_impossible_requests_get_422(url):
+    status, error = _post(url, json.dumps({"num": 2, "unique": True, "subclasses": ["Champion"]}).encode())
+    assert status == 422
+    assert "distinct builds" in error["error"]
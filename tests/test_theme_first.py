@@ -0,0 +1,74 @@
+import os
+import random
+import threading
+from collections import Counter
+
+import pytest
+
+from bg3_random_build.analysis import has_martial_access, martial_access_level
+from bg3_random_build.catalog import load_catalog
+from bg3_random_build.generator import BuildGenerator
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog(
+        os.path.join(ROOT, "breakpoints.csv"),
+        os.path.join(ROOT, "themes.csv"),
+        use_cache=False,
+    )
+
+
+def fitting(catalog, build):
+    mask = 0
+    for subclass_id in build.subclass_ids:
+        mask |= catalog.capability_masks[subclass_id]
+    access = [
+        martial_access_level(catalog.parent_of(subclass_id), catalog.ea_thresholds[subclass_id])
+        for subclass_id in build.subclass_ids
+    ]
+    return catalog.theme_index.fitting(mask, has_martial_access(build.levels, access))
+
+
+def test_theme_first_adjective_always_fits(catalog):
+    generator = BuildGenerator(catalog, theme_first=True)
+    builds = generator.generate_builds(2000, rng=random.Random(3))
+    for build in builds:
+        assert build.adjective in fitting(catalog, build)
+    # Uniform over themes: every theme shows up in 2000 draws.
+    assert len(Counter(build.adjective for build in builds)) > len(catalog.themes) * 0.9
+
+
+def test_infeasible_themes_are_never_drawn(catalog):
+    # Casters only: no subclass can reach martial access, so themes that need
+    # it are dropped instead of failing the draw.
+    casters = catalog.subset(("Evocation", "Life", "Storm"))
+    generator = BuildGenerator(casters, theme_first=True)
+    for build in generator.generate_builds(500, rng=random.Random(4)):
+        assert build.adjective in fitting(casters, build)
+
+
+def test_threads_can_share_a_theme_first_generator(catalog):
+    generator = BuildGenerator(catalog, theme_first=True)
+    errors = []
+    builds = []
+
+    def work(seed):
+        try:
+            builds.extend(generator.generate_builds(300, rng=random.Random(seed)))
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(seed,)) for seed in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(builds) == 1800
+    for build in builds:
+        assert build.adjective in fitting(catalog, build)
@@ -0,0 +1,64 @@
+import os
+import random
+
+import pytest
+
+from bg3_random_build.catalog import load_catalog
+from bg3_random_build.constraints import BuildConstraints
+from bg3_random_build.distribution import enumerate_builds
+from bg3_random_build.generator import BuildGenerator
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUBCLASSES = ("Champion", "Evocation", "Thief")
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog(
+        os.path.join(ROOT, "breakpoints.csv"),
+        os.path.join(ROOT, "themes.csv"),
+        use_cache=False,
+    )
+
+
+def test_enumerated_space_is_drawn_without_repeats(catalog):
+    generator = BuildGenerator(catalog.subset(SUBCLASSES))
+    space = set(enumerate_builds(generator.catalog, level_cap=generator.level_cap))
+
+    issued = set()
+    first = generator.generate_builds(4, rng=random.Random(1), unique=True, issued=issued)
+    rest = generator.generate_builds(len(space) - 4, rng=random.Random(2), unique=True, issued=issued)
+    keys = [build.key for build in first + rest]
+    assert len(set(keys)) == len(keys)
+    assert set(keys) == space == issued
+
+    with pytest.raises(RuntimeError, match="Only 0 new distinct builds"):
+        generator.generate_builds(1, rng=random.Random(3), unique=True, issued=issued)
+    assert issued == space
+
+
+def test_request_larger_than_space_fails_up_front(catalog):
+    generator = BuildGenerator(catalog.subset(SUBCLASSES))
+    size = len(enumerate_builds(generator.catalog, level_cap=generator.level_cap))
+    issued = set()
+    with pytest.raises(RuntimeError, match=f"Only {size} new distinct builds"):
+        generator.generate_builds(size + 1, rng=random.Random(1), unique=True, issued=issued)
+    assert not issued
+
+
+def test_issued_builds_outside_the_space_do_not_count(catalog):
+    generator = BuildGenerator(catalog.subset(SUBCLASSES))
+    size = len(enumerate_builds(generator.catalog, level_cap=generator.level_cap))
+    # Builds of other subclasses, e.g. from an issued file of a larger catalog.
+    issued = {(("Life", level), ("Storm", 12 - level)) for level in range(1, 12)}
+    builds = generator.generate_builds(size, rng=random.Random(1), unique=True, issued=issued)
+    assert len({build.key for build in builds}) == size
+
+
+def test_regenerated_builds_have_no_repeats(catalog):
+    generator = BuildGenerator(catalog, constraints=BuildConstraints(subclasses=("Champion",)))
+    builds = generator.generate_builds(300, rng=random.Random(4), unique=True)
+    keys = [build.key for build in builds]
+    assert len(set(keys)) == len(keys) == 300
+    assert all("Champion" in build.subclasses for build in builds)